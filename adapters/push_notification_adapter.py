@@ -15,17 +15,46 @@ Features:
 """
 
 import asyncio
+import atexit
+import functools
 import json
 import os
+import tempfile
 import uuid
+from collections import ChainMap
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional, Callable
+import aiofiles
 import firebase_admin
+import orjson
 from firebase_admin import credentials, messaging
 from firebase_admin import App as firebase_app
 
+# FCM accepts at most this many tokens in one multicast request
+FCM_MULTICAST_LIMIT = 500
+
+# Reuse a signed APNS JWT for this many seconds (Apple rejects them after an hour)
+APNS_JWT_TTL = 3000
+
+# Coalesce token registrations into one save per this many seconds
+TOKEN_SAVE_DELAY = 5.0
+
+# Adapters with a debounced token save still pending; flushed at interpreter exit.
+# Held strongly: asyncio.run() cancels the save task, and nothing else may keep
+# an adapter with acknowledged registrations alive until the flush.
+_PENDING_SAVES: "set[PushNotificationAdapter]" = set()
+
+
+@atexit.register
+def _flush_pending_saves() -> None:
+    """Write tokens whose delayed save had not run when the process exits"""
+    for adapter in list(_PENDING_SAVES):
+        _PENDING_SAVES.discard(adapter)
+        adapter._save_tokens()
+
 
 class Platform(Enum):
     """Device platforms"""
@@ -210,7 +239,7 @@ class WebpushConfig:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceToken:
     """Device registration token"""
 
@@ -278,6 +307,99 @@ class NotificationChannel:
         }
 
 
+# Built-in Android channels, shared read-only by every adapter instance
+_DEFAULT_CHANNELS = MappingProxyType(
+    {
+        channel.id: channel
+        for channel in (
+            NotificationChannel(
+                id="megabot_default",
+                name="MegaBot Messages",
+                description="General notifications from MegaBot",
+                importance=4,
+            ),
+            NotificationChannel(
+                id="megabot_alerts",
+                name="Alerts",
+                description="Important alerts and reminders",
+                importance=5,
+                enable_vibration=True,
+            ),
+            NotificationChannel(
+                id="megabot_messages",
+                name="Messages",
+                description="Direct messages and conversations",
+                importance=4,
+            ),
+            NotificationChannel(
+                id="megabot_silent",
+                name="Silent",
+                description="Silent notifications without sound",
+                importance=2,
+                enable_vibration=False,
+                sound=None,
+            ),
+        )
+    }
+)
+
+
+class _ChannelMap(ChainMap):
+    """An adapter's own channels layered over the shared default channels.
+
+    Writes go to the adapter's own layer. Deleting a default channel hides it
+    for this adapter only. The shared default objects must not be mutated;
+    register a replacement with create_notification_channel instead.
+    """
+
+    def __init__(self, *maps):
+        super().__init__(*maps)
+        self._hidden: set = set()
+
+    def add_defaults(self, defaults) -> None:
+        """Layer ``defaults`` underneath, replacing own channels with their ids"""
+        for channel_id in defaults:
+            self.maps[0].pop(channel_id, None)
+            self._hidden.discard(channel_id)
+        if not any(m is defaults for m in self.maps[1:]):
+            self.maps.append(defaults)
+
+    def __getitem__(self, key):
+        if key in self._hidden:
+            return self.__missing__(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key) -> bool:
+        return key not in self._hidden and super().__contains__(key)
+
+    def __iter__(self):
+        return (key for key in super().__iter__() if key not in self._hidden)
+
+    def __len__(self) -> int:
+        return len(set().union(*self.maps) - self._hidden)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __setitem__(self, key, value) -> None:
+        self._hidden.discard(key)
+        self.maps[0][key] = value
+
+    def __delitem__(self, key) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self.maps[0].pop(key, None)
+        if any(key in m for m in self.maps[1:]):
+            self._hidden.add(key)
+
+    def copy(self) -> "_ChannelMap":
+        new = super().copy()
+        new._hidden = set(self._hidden)
+        return new
+
+    __copy__ = copy
+
+
 @dataclass
 class NotificationResult:
     """Result of sending a notification"""
@@ -364,9 +486,15 @@ class PushNotificationAdapter:
 
         self._firebase_app: Optional[firebase_app] = None
         self._is_initialized = False
+        self._apns_jwt_cache: Optional[tuple[str, float]] = None
+        self._save_task: Optional[asyncio.Task] = None
 
-        self.device_tokens: Dict[str, DeviceToken] = {}
-        self.notification_channels: Dict[str, NotificationChannel] = {}
+        self._device_tokens: Dict[str, DeviceToken] = {}
+        # Secondary indexes over device_tokens (token -> None, insertion ordered)
+        self._tokens_by_user: Dict[Optional[str], Dict[str, None]] = {}
+        self._tokens_by_platform: Dict[Platform, Dict[str, None]] = {}
+        # Own channels; initialize() layers the shared defaults underneath
+        self.notification_channels: _ChannelMap = _ChannelMap()
 
         self.message_handlers: List[Callable] = []
         self.token_update_handlers: List[Callable] = []
@@ -394,6 +522,10 @@ class PushNotificationAdapter:
 
     def shutdown(self) -> None:
         """Clean up resources"""
+        if self._save_task:
+            self._save_task.cancel()
+            self._save_task = None
+        _PENDING_SAVES.discard(self)
         self._save_tokens()
         if self._firebase_app:
             try:
@@ -423,6 +555,63 @@ class PushNotificationAdapter:
         else:
             print("[Push] No FCM credentials provided, FCM disabled")
 
+    @property
+    def device_tokens(self) -> Dict[str, DeviceToken]:
+        """Registered device tokens keyed by token string.
+
+        Register/unregister tokens, or assign a new dict, to keep the user and
+        platform indexes in step; in-place edits are tolerated but not indexed.
+        """
+        return self._device_tokens
+
+    @device_tokens.setter
+    def device_tokens(self, tokens: Dict[str, DeviceToken]) -> None:
+        self._device_tokens = tokens
+        self._rebuild_indexes()
+
+    def _index_token(self, device_token: DeviceToken) -> None:
+        """Add a token to the user and platform indexes"""
+        self._tokens_by_user.setdefault(device_token.user_id, {})[
+            device_token.token
+        ] = None
+        self._tokens_by_platform.setdefault(device_token.platform, {})[
+            device_token.token
+        ] = None
+
+    def _unindex_token(self, device_token: DeviceToken) -> None:
+        """Drop a token from the user and platform indexes"""
+        for index, key in (
+            (self._tokens_by_user, device_token.user_id),
+            (self._tokens_by_platform, device_token.platform),
+        ):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(device_token.token, None)
+                if not bucket:
+                    del index[key]
+
+    def _rebuild_indexes(self) -> None:
+        """Rebuild the secondary indexes from device_tokens"""
+        self._tokens_by_user = {}
+        self._tokens_by_platform = {}
+        for device_token in self._device_tokens.values():
+            self._index_token(device_token)
+
+    def _indexed_tokens(self, *indexes: Dict[str, None]) -> List[DeviceToken]:
+        """Active tokens present in every given index (all tokens if none)"""
+        if not indexes:
+            return [t for t in self._device_tokens.values() if t.is_active]
+
+        smallest, *rest = sorted(indexes, key=len)
+        tokens = []
+        for key in smallest:
+            if all(key in index for index in rest):
+                # Skip index entries left behind by in-place dict edits
+                device_token = self._device_tokens.get(key)
+                if device_token is not None and device_token.is_active:
+                    tokens.append(device_token)
+        return tokens
+
     def _load_tokens(self) -> None:
         """Load device tokens from storage"""
         try:
@@ -432,54 +621,53 @@ class PushNotificationAdapter:
                     for token_data in tokens_data:
                         token = DeviceToken.from_dict(token_data)
                         self.device_tokens[token.token] = token
+                        self._index_token(token)
                 print(f"[Push] Loaded {len(self.device_tokens)} device tokens")
         except Exception as e:
             print(f"[Push] Failed to load tokens: {e}")
 
     def _save_tokens(self) -> None:
-        """Save device tokens to storage"""
+        """Save device tokens to storage (atomically, via a temp file)"""
         try:
-            os.makedirs(os.path.dirname(self.token_storage_path), exist_ok=True)
-            tokens_data = [token.to_dict() for token in self.device_tokens.values()]
-            with open(self.token_storage_path, "w") as f:
-                json.dump(tokens_data, f)
+            directory = os.path.dirname(self.token_storage_path) or "."
+            os.makedirs(directory, exist_ok=True)
+            tokens_data = orjson.dumps(
+                [token.to_dict() for token in self.device_tokens.values()]
+            )
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(tokens_data)
+                os.replace(tmp_path, self.token_storage_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
         except Exception as e:
             print(f"[Push] Failed to save tokens: {e}")
 
+    def _schedule_save(self) -> None:
+        """Save device tokens after TOKEN_SAVE_DELAY, coalescing repeated calls.
+
+        A save still pending at interpreter exit is flushed by an atexit hook.
+        """
+        if self._save_task and not self._save_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._save_tokens()
+            return
+        self._save_task = loop.create_task(self._save_tokens_later())
+        _PENDING_SAVES.add(self)
+
+    async def _save_tokens_later(self) -> None:
+        await asyncio.sleep(TOKEN_SAVE_DELAY)
+        _PENDING_SAVES.discard(self)
+        self._save_tokens()
+
     def _create_default_channels(self) -> None:
         """Create default notification channels"""
-        channels = [
-            NotificationChannel(
-                id="megabot_default",
-                name="MegaBot Messages",
-                description="General notifications from MegaBot",
-                importance=4,
-            ),
-            NotificationChannel(
-                id="megabot_alerts",
-                name="Alerts",
-                description="Important alerts and reminders",
-                importance=5,
-                enable_vibration=True,
-            ),
-            NotificationChannel(
-                id="megabot_messages",
-                name="Messages",
-                description="Direct messages and conversations",
-                importance=4,
-            ),
-            NotificationChannel(
-                id="megabot_silent",
-                name="Silent",
-                description="Silent notifications without sound",
-                importance=2,
-                enable_vibration=False,
-                sound=None,
-            ),
-        ]
-
-        for channel in channels:
-            self.notification_channels[channel.id] = channel
+        self.notification_channels.add_defaults(_DEFAULT_CHANNELS)
 
     async def register_token(
         self,
@@ -505,8 +693,12 @@ class PushNotificationAdapter:
                 token=token, platform=platform, user_id=user_id, app_id=app_id
             )
 
+            previous = self.device_tokens.get(token)
+            if previous is not None:
+                self._unindex_token(previous)
             self.device_tokens[token] = device_token
-            self._save_tokens()
+            self._index_token(device_token)
+            self._schedule_save()
 
             for handler in self.token_update_handlers:
                 try:
@@ -532,8 +724,8 @@ class PushNotificationAdapter:
         """
         try:
             if token in self.device_tokens:
-                del self.device_tokens[token]
-                self._save_tokens()
+                self._unindex_token(self.device_tokens.pop(token))
+                self._schedule_save()
 
                 for handler in self.token_update_handlers:
                     try:
@@ -629,32 +821,42 @@ class PushNotificationAdapter:
             Combined notification result
         """
         try:
-            user_tokens = [
-                token
-                for token in self.device_tokens.values()
-                if token.user_id == user_id and token.is_active
-            ]
-
+            indexes = [self._tokens_by_user.get(user_id, {})]
             if platform:
-                user_tokens = [t for t in user_tokens if t.platform == platform]
+                indexes.append(self._tokens_by_platform.get(platform, {}))
+            user_tokens = self._indexed_tokens(*indexes)
 
             if not user_tokens:
                 return NotificationResult(
                     success=False, error=f"No active tokens found for user: {user_id}"
                 )
 
-            results = []
-            for token in user_tokens:
-                result = await self.send_to_token(
-                    token=token.token,
-                    notification=notification,
-                    platform=token.platform,
-                    android_config=android_config,
-                    apns_config=apns_config,
-                    webpush_config=webpush_config,
-                    dry_run=dry_run,
-                )
-                results.append(result)
+            # Several Android devices share one FCM multicast request
+            multicast_tokens: List[str] = []
+            if sum(t.platform == Platform.ANDROID for t in user_tokens) > 1:
+                multicast_tokens = [
+                    t.token for t in user_tokens if t.platform == Platform.ANDROID
+                ]
+                user_tokens = [t for t in user_tokens if t.platform != Platform.ANDROID]
+
+            single_results, multicast_results = await asyncio.gather(
+                asyncio.gather(
+                    *(
+                        self.send_to_token(
+                            token=token.token,
+                            notification=notification,
+                            platform=token.platform,
+                            android_config=android_config,
+                            apns_config=apns_config,
+                            webpush_config=webpush_config,
+                            dry_run=dry_run,
+                        )
+                        for token in user_tokens
+                    )
+                ),
+                self.send_multicast(multicast_tokens, notification, dry_run=dry_run),
+            )
+            results = [*single_results, *multicast_results]
 
             success_count = sum(1 for r in results if r.success)
             return NotificationResult(
@@ -668,6 +870,87 @@ class PushNotificationAdapter:
             print(f"[Push] Send to user failed: {e}")
             return NotificationResult(success=False, error=str(e))
 
+    async def send_multicast(
+        self,
+        tokens: List[str],
+        notification: PushNotification,
+        dry_run: bool = False,
+    ) -> List[NotificationResult]:
+        """
+        Send one notification to many FCM device tokens.
+
+        Tokens are sent in batches of FCM_MULTICAST_LIMIT per request.
+
+        Args:
+            tokens: Device registration tokens
+            notification: Notification payload
+            dry_run: Validate without sending
+
+        Returns:
+            One NotificationResult per token, in the order given
+        """
+        if not tokens:
+            return []
+        if not self._firebase_app:
+            return [
+                NotificationResult(success=False, error="FCM not initialized")
+                for _ in tokens
+            ]
+        if dry_run:
+            return [NotificationResult(success=True) for _ in tokens]
+
+        loop = asyncio.get_running_loop()
+        results: List[NotificationResult] = []
+        for start in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+            batch = tokens[start : start + FCM_MULTICAST_LIMIT]
+            msg = messaging.MulticastMessage(
+                tokens=batch,
+                notification=messaging.Notification(
+                    title=notification.title,
+                    body=notification.body,
+                    image=notification.image_url,
+                ),
+                android=messaging.AndroidConfig(
+                    priority=self._to_fcm_priority(notification.priority),
+                    notification=messaging.AndroidNotification(
+                        channel_id=notification.channel_id or self.default_channel_id,
+                        click_action=notification.click_action,
+                        color=notification.color,
+                        tag=notification.tag,
+                        ticker=notification.ticker,
+                        sticky=notification.sticky,
+                        local_only=notification.local_only,
+                        icon=notification.icon,
+                        sound=notification.sound,
+                    ),
+                ),
+                data=notification.data,
+            )
+            try:
+                response = await loop.run_in_executor(
+                    None,
+                    functools.partial(
+                        messaging.send_each_for_multicast, msg, dry_run=dry_run
+                    ),
+                )
+            except Exception as e:
+                print(f"[Push] Multicast failed: {e}")
+                results.extend(
+                    NotificationResult(success=False, error=str(e)) for _ in batch
+                )
+                continue
+
+            for token, send_response in zip(batch, response.responses):
+                result = NotificationResult.from_firebase(send_response)
+                if result.error and "UNREGISTERED" in result.error:
+                    await self.unregister_token(token)
+                    result = NotificationResult(
+                        success=False, error="Token unregistered"
+                    )
+                results.append(result)
+
+        return results
+
     async def send_broadcast(
         self,
         notification: PushNotification,
@@ -754,9 +1037,7 @@ class PushNotificationAdapter:
                     ),
                 )
 
-            response = messaging.send_each_for_multicast_sync(  # type: ignore[attr-defined]
-                msg, dry_run=dry_run
-            )
+            response = messaging.send_each_for_multicast(msg, dry_run=dry_run)
             return NotificationResult(
                 success=response.success_count > 0,
                 error=response.failure_count > 0 and "Some messages failed" or None,
@@ -1047,9 +1328,14 @@ class PushNotificationAdapter:
         if not self.apns_key_path or not self.apns_key_id:
             return ""
 
+        if self._apns_jwt_cache:
+            cached_token, issued_at = self._apns_jwt_cache
+            if time.time() - issued_at < APNS_JWT_TTL:
+                return cached_token
+
         try:
-            with open(self.apns_key_path, "r") as f:
-                private_key = f.read()
+            async with aiofiles.open(self.apns_key_path, "r") as f:
+                private_key = await f.read()
         except Exception:
             return ""
 
@@ -1063,6 +1349,7 @@ class PushNotificationAdapter:
                 algorithm="ES256",
                 headers={"kid": self.apns_key_id},
             )
+            self._apns_jwt_cache = (token, now)
             return token
         except Exception:
             return ""
@@ -1088,6 +1375,8 @@ class PushNotificationAdapter:
         """
         Delete an Android notification channel.
 
+        Deleting a default channel hides it for this adapter only.
+
         Args:
             channel_id: Channel ID to delete
 
@@ -1115,14 +1404,13 @@ class PushNotificationAdapter:
         Returns:
             List of active device tokens
         """
-        tokens = [t for t in self.device_tokens.values() if t.is_active]
-
+        indexes = []
         if user_id:
-            tokens = [t for t in tokens if t.user_id == user_id]
+            indexes.append(self._tokens_by_user.get(user_id, {}))
         if platform:
-            tokens = [t for t in tokens if t.platform == platform]
+            indexes.append(self._tokens_by_platform.get(platform, {}))
 
-        return tokens
+        return self._indexed_tokens(*indexes)
 
     async def cleanup_inactive_tokens(self, max_inactive_days: int = 30) -> int:
         """
@@ -10,17 +10,10 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Callable
 from dataclasses import dataclass, field
 
-try:
-    import slack_sdk
-    from slack_sdk import WebClient
-    from slack_sdk.socket_mode import SocketModeClient
-    from slack_sdk.socket_mode.request import SocketModeRequest
-    from slack_sdk.socket_mode.response import SocketModeResponse
-except ImportError:
-    # Fallback mocks for when slack-sdk is not installed
-    from unittest.mock import MagicMock
 
-    slack_sdk = MagicMock()
+def _slack_sdk_fallbacks():
+    """Return mock stand-ins for the slack-sdk names used by this module"""
+    from unittest.mock import MagicMock
 
     class WebClient:
         def __init__(self, *args, **kwargs):
@@ -33,8 +26,24 @@ except ImportError:
         def __init__(self, *args, **kwargs):
             pass
 
-    SocketModeRequest = MagicMock()
-    SocketModeResponse = MagicMock()
+    return MagicMock(), WebClient, SocketModeClient, MagicMock(), MagicMock()
+
+
+try:
+    import slack_sdk
+    from slack_sdk import WebClient
+    from slack_sdk.socket_mode import SocketModeClient
+    from slack_sdk.socket_mode.request import SocketModeRequest
+    from slack_sdk.socket_mode.response import SocketModeResponse
+except ImportError:
+    # Fallback mocks for when slack-sdk is not installed
+    (
+        slack_sdk,
+        WebClient,
+        SocketModeClient,
+        SocketModeRequest,
+        SocketModeResponse,
+    ) = _slack_sdk_fallbacks()
 
 
 from adapters.messaging import PlatformMessage, MessageType, PlatformAdapter
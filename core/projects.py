@@ -1,7 +1,44 @@
+import os
 import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+# Project trees with more entries than this are unlinked from a thread pool
+PARALLEL_DELETE_THRESHOLD = 10_000
+DELETE_WORKERS = 8
+
+
+def _rmtree(root: Path, workers: int = DELETE_WORKERS):
+    """Delete a tree, unlinking files from a thread pool when it is large.
+
+    One os.scandir walk sizes the tree. Trees of up to
+    PARALLEL_DELETE_THRESHOLD entries go to shutil.rmtree; larger ones have
+    their files unlinked in parallel and directories removed post-order.
+    """
+    files: list[str] = []
+    dirs: list[str] = [str(root)]
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+
+    if len(files) + len(dirs) - 1 <= PARALLEL_DELETE_THRESHOLD:
+        shutil.rmtree(root)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(os.unlink, files))
+    # Children are always discovered after their parent
+    for path in reversed(dirs):
+        os.rmdir(path)
+
+
 class ProjectContext:
     def __init__(self, name: str, base_path: str):
         self.name = name
@@ -28,7 +65,25 @@ class ProjectContext:
 
     def list_files(self):
         """List files in the project workspace"""
-        return [str(p.relative_to(self.files_path)) for p in self.files_path.rglob("*") if p.is_file()]
+        # Breadth-first os.scandir: one directory read per folder, with
+        # file/dir checks answered from the cached entry type
+        files = []
+        pending = deque([""])
+        while pending:
+            rel_dir = pending.popleft()
+            try:
+                entries = os.scandir(self.files_path / rel_dir)
+            except OSError:
+                # Workspace deleted, or a folder removed mid-walk
+                continue
+            with entries:
+                for entry in entries:
+                    rel_path = os.path.join(rel_dir, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(rel_path)
+                    elif entry.is_file():
+                        files.append(rel_path)
+        return files
 
 class ProjectManager:
     def __init__(self, base_path: str):
@@ -47,7 +102,12 @@ class ProjectManager:
     def delete_project(self, name: str):
         """Delete a project workspace"""
         project_path = Path(self.base_path) / "projects" / name
+        if project_path.is_symlink():
+            # Never walk into (and empty) whatever the link points at
+            raise OSError(
+                f"Cannot delete project {name!r}: {project_path} is a symbolic link"
+            )
         if project_path.exists():
-            shutil.rmtree(project_path)
+            _rmtree(project_path)
         if self.current_project and self.current_project.name == name:
             self.current_project = None
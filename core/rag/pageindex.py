@@ -1,7 +1,49 @@
 import os
 import re
 import json
-from typing import List, Dict, Any, Optional
+import mmap
+import sys
+import hashlib
+from contextlib import nullcontext
+from typing import Any, Optional
+from collections.abc import Iterator
+
+try:
+    from blake3 import blake3
+except ImportError:
+    # Optional: hashlib.blake2b is used for content hashes when absent
+    blake3 = None
+
+# On-disk index schema. v1 stored one dict per file under each folder's
+# "files" key; v2 stores the per-file fields as parallel columns.
+INDEX_VERSION = 2
+FILE_COLUMNS = ("names", "sizes", "summaries", "headers", "hashes")
+
+# Only the head of a file feeds the quick summary, and only the first lines
+# are returned as file context, so neither needs the whole file decoded.
+SUMMARY_READ_BYTES = 64 * 1024
+CONTEXT_LINES = 100
+
+# Content hashes only key the rebuild cache, so 64 bits is plenty.
+CONTENT_HASH_BYTES = 8
+
+# Words indexed into the keyword postings (token -> sorted file paths)
+_TOKEN_RE = re.compile(r"\w+")
+MAX_NAVIGATION_RESULTS = 5
+
+_SYMBOL_PATTERNS = {
+    ".py": r"^(?:class|def)\s+([a-zA-Z_][a-zA-Z0-9_]*)",
+    ".js": r"^(?:class|function|const)\s+([a-zA-Z_][a-zA-Z0-9_]*)",
+    ".ts": r"^(?:class|function|const)\s+([a-zA-Z_][a-zA-Z0-9_]*)",
+    ".md": r"^#+\s+(.+)$",
+}
+_STR_SYMBOL_RES = {
+    ext: re.compile(pattern, re.MULTILINE) for ext, pattern in _SYMBOL_PATTERNS.items()
+}
+_BYTES_SYMBOL_RES = {
+    ext: re.compile(pattern.encode(), re.MULTILINE)
+    for ext, pattern in _SYMBOL_PATTERNS.items()
+}
 
 
 class PageIndexRAG:
@@ -14,25 +56,55 @@ class PageIndexRAG:
     def __init__(self, root_dir: str, llm: Optional[Any] = None):
         self.root_dir = root_dir
         self.llm = llm
-        self.index: Dict[str, Any] = {}
+        # Views derived from the index, dropped whenever it changes: collapsed
+        # trees per max_depth, and keyword postings (kept in memory only)
+        self._collapsed_cache: dict[int, dict] = {}
+        self._inv: Optional[dict[str, list[str]]] = None
+        self.index: dict[str, Any] = {}
         self.index_path = os.path.join(root_dir, ".megabot_index.json")
 
+    @property
+    def index(self) -> dict[str, Any]:
+        return self._index
+
+    @index.setter
+    def index(self, value: dict[str, Any]):
+        self._index = value
+        self._index_changed()
+
+    def _index_changed(self):
+        """Drops the views derived from the index after it is edited."""
+        self._collapsed_cache.clear()
+        self._inv = None
+
     async def build_index(self, force_rebuild: bool = False):
         """Creates a hierarchical map of the codebase with summaries. Uses cache if available."""
         if not force_rebuild and os.path.exists(self.index_path):
             try:
                 print(f"RAG: Loading cached index from {self.index_path}...")
-                with open(self.index_path, "r") as f:
-                    self.index = json.load(f)
+                self.index = self._load_cached_index()
+                self._intern_headers(self.index)
                 return
             except Exception as e:
                 print(f"RAG: Failed to load cache: {e}")
 
         print(f"RAG: Building structural index for {self.root_dir}...")
-        self.index = {"root": self.root_dir, "files": {}, "folders": {}}
+        # Files whose content hash is unchanged reuse their previous entry,
+        # taken from the on-disk cache when nothing is loaded yet
+        previous = self.index if self.index.get("version") == INDEX_VERSION else {}
+        if not previous and os.path.exists(self.index_path):
+            try:
+                previous = self._load_cached_index()
+            except Exception as e:
+                print(f"RAG: Failed to load cache: {e}")
+        self.index = {
+            "root": self.root_dir,
+            "version": INDEX_VERSION,
+            **self._new_folder(),
+        }
 
         # ... (rest of building logic) ...
-        self._walk_and_index(self.root_dir, self.index)
+        self._walk_and_index(self.root_dir, self.index, previous)
 
         # Save to cache
         try:
@@ -42,7 +114,17 @@ class PageIndexRAG:
         except Exception as e:
             print(f"RAG: Failed to save cache: {e}")
 
-    def _walk_and_index(self, root_dir, current_index):
+    def _load_cached_index(self) -> dict[str, Any]:
+        """Reads the cached index, upgraded to the current layout."""
+        with open(self.index_path, "r") as f:
+            index = json.load(f)
+        # Postings from older caches; they are rebuilt on demand
+        index.pop("_inv", None)
+        if index.get("version") != INDEX_VERSION:
+            index = self._migrate_v1_to_v2(index)
+        return index
+
+    def _walk_and_index(self, root_dir, current_index, previous=None):
         for root, dirs, files in os.walk(root_dir):
             # Avoid hidden folders and common noise
             dirs[:] = [
@@ -54,11 +136,14 @@ class PageIndexRAG:
 
             rel_path = os.path.relpath(root, root_dir)
             current = current_index
+            prev = previous
             if rel_path != ".":
                 for part in rel_path.split(os.sep):
                     if part not in current["folders"]:
-                        current["folders"][part] = {"files": {}, "folders": {}}
+                        current["folders"][part] = self._new_folder()
                     current = current["folders"][part]
+                    prev = (prev or {}).get("folders", {}).get(part)
+            prev_files = self._hashed_files(prev)
 
             for file in files:
                 if file.endswith(
@@ -66,34 +151,154 @@ class PageIndexRAG:
                 ):
                     file_path = os.path.join(root, file)
                     try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            content = f.read()
-
-                        current["files"][file] = {
-                            "size": len(content),
-                            "headers": self._extract_symbols(content, file),
-                            "summary": self._generate_quick_summary(content),
-                        }
+                        with open(file_path, "rb") as f, self._map_file(f) as data:
+                            digest = self._content_hash(data)
+                            cached = prev_files.get(file)
+                            if cached and cached[0] == digest:
+                                headers, summary = cached[1], cached[2]
+                            else:
+                                head = data[:SUMMARY_READ_BYTES]
+                                headers = self._extract_symbols(data, file)
+                                summary = self._generate_quick_summary(
+                                    head.decode("utf-8", errors="replace")
+                                )
+                            self._append_file(
+                                current, file, len(data), headers, summary, digest
+                            )
                     except Exception:
                         continue
         # Since os.walk already visits everything, we don't need to manually recurse here
         # but the way I structured build_index previously was a bit different.
         # Let's keep it consistent.
 
-    def _extract_symbols(self, content: str, filename: str) -> List[str]:
-        if filename.endswith(".py"):
-            return re.findall(
-                r"^(?:class|def)\s+([a-zA-Z_][a-zA-Z0-9_]*)", content, re.MULTILINE
-            )
-        if filename.endswith((".js", ".ts")):
-            return re.findall(
-                r"^(?:class|function|const)\s+([a-zA-Z_][a-zA-Z0-9_]*)",
-                content,
-                re.MULTILINE,
+    @staticmethod
+    def _new_folder() -> dict[str, Any]:
+        return {"files": {col: [] for col in FILE_COLUMNS}, "folders": {}}
+
+    @staticmethod
+    def _to_columns(files: dict[str, Any]) -> dict[str, list[Any]]:
+        """Converts a v1 ``{name: {...}}`` files mapping into v2 columns."""
+        if isinstance(files.get("names"), list):
+            return files
+        return {
+            "names": list(files),
+            "sizes": [info.get("size", 0) for info in files.values()],
+            "summaries": [info.get("summary", "") for info in files.values()],
+            "headers": [info.get("headers", []) for info in files.values()],
+            "hashes": [info.get("hash", "") for info in files.values()],
+        }
+
+    def _set_folder_files(self, folder: dict[str, Any], items: dict[str, Any]):
+        """Replaces a folder's files with a v1-style ``{name: info}`` mapping."""
+        folder["files"] = self._to_columns(items)
+        self._index_changed()
+
+    def _append_file(
+        self,
+        folder: dict[str, Any],
+        name: str,
+        size: int,
+        headers: list[str],
+        summary: str,
+        digest: str = "",
+    ):
+        files = folder["files"] = self._to_columns(folder["files"])
+        files["names"].append(name)
+        files["sizes"].append(size)
+        files["summaries"].append(summary)
+        files["headers"].append(headers)
+        files["hashes"].append(digest)
+        self._index_changed()
+
+    def _hashed_files(
+        self, folder: Optional[dict[str, Any]]
+    ) -> dict[str, tuple[str, list[str], str]]:
+        """Maps file name to ``(hash, headers, summary)`` for hashed entries."""
+        if not folder:
+            return {}
+        files = self._to_columns(folder.get("files", {}))
+        return {
+            name: (digest, headers, summary)
+            for name, digest, headers, summary in zip(
+                files["names"],
+                files.get("hashes", ()),
+                files["headers"],
+                files["summaries"],
             )
-        if filename.endswith(".md"):
-            return re.findall(r"^#+\s+(.+)$", content, re.MULTILINE)
-        return []
+            if digest
+        }
+
+    def _iter_files(
+        self, folder: dict[str, Any]
+    ) -> Iterator[tuple[str, str, list[str]]]:
+        """Yields ``(name, summary, headers)`` for a folder in either schema."""
+        files = self._to_columns(folder.get("files", {}))
+        return zip(files["names"], files["summaries"], files["headers"])
+
+    def _build_inverted_index(self, index: dict[str, Any]) -> dict[str, list[str]]:
+        """Maps each lowercase word in paths, summaries and symbols to files."""
+        postings: dict[str, set] = {}
+
+        def add(folder, path):
+            for fname, summary, headers in self._iter_files(folder):
+                fpath = os.path.join(path, fname)
+                text = " ".join([fpath, summary, *headers]).lower()
+                for tok in set(_TOKEN_RE.findall(text)):
+                    postings.setdefault(tok, set()).add(fpath)
+            for dname, sub in folder.get("folders", {}).items():
+                add(sub, os.path.join(path, dname))
+
+        add(index, "")
+        return {tok: sorted(paths) for tok, paths in postings.items()}
+
+    def _intern_headers(self, folder: dict[str, Any]):
+        """Interns symbol names so names repeated across files share storage."""
+        headers = folder.get("files", {}).get("headers")
+        if isinstance(headers, list):
+            headers[:] = [[sys.intern(h) for h in hs] for hs in headers]
+        for sub in folder.get("folders", {}).values():
+            self._intern_headers(sub)
+
+    def _migrate_v1_to_v2(self, index: dict[str, Any]) -> dict[str, Any]:
+        """Upgrades a cached v1 index in place to the columnar v2 layout."""
+
+        def migrate(folder):
+            folder["files"] = self._to_columns(folder.get("files", {}))
+            for sub in folder.setdefault("folders", {}).values():
+                migrate(sub)
+
+        migrate(index)
+        index["version"] = INDEX_VERSION
+        self._index_changed()
+        return index
+
+    @staticmethod
+    def _map_file(f):
+        """Maps an open binary file read-only; empty files cannot be mapped."""
+        if os.fstat(f.fileno()).st_size == 0:
+            return nullcontext(b"")
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _content_hash(data) -> str:
+        """Hashes a bytes-like buffer (e.g. an mmap) without copying it."""
+        if blake3 is not None:
+            return blake3(data).hexdigest(length=CONTENT_HASH_BYTES)
+        return hashlib.blake2b(data, digest_size=CONTENT_HASH_BYTES).hexdigest()
+
+    def _extract_symbols(self, content, filename: str) -> list[str]:
+        """Extracts symbols from text, or zero-copy from a bytes-like buffer."""
+        ext = os.path.splitext(filename)[1]
+        if isinstance(content, str):
+            pattern = _STR_SYMBOL_RES.get(ext)
+            return [sys.intern(m) for m in pattern.findall(content)] if pattern else []
+        pattern = _BYTES_SYMBOL_RES.get(ext)
+        if not pattern:
+            return []
+        return [
+            sys.intern(m.decode("utf-8", errors="replace").rstrip("\r"))
+            for m in pattern.findall(content)
+        ]
 
     def _generate_quick_summary(self, content: str) -> str:
         # Take the first few non-empty lines
@@ -114,29 +319,58 @@ class PageIndexRAG:
 
         return self._keyword_navigation(query)
 
+    @staticmethod
+    def _format_result(fpath: str, summary: str, headers: list[str]) -> str:
+        return f"File: {fpath}\n  Summary: {summary}\n  Symbols: {headers[:5]}"
+
+    def _keyword_candidates(self, q: str) -> Optional[set]:
+        """Files that may contain ``q``, from the postings; None means scan all.
+
+        Each word of a substring match lies inside some indexed word of the
+        matching file, so this only narrows the scan and never drops a hit.
+        """
+        tokens = set(_TOKEN_RE.findall(q))
+        if not self.index or not tokens:
+            return None
+        if self._inv is None:
+            self._inv = self._build_inverted_index(self.index)
+        inverted = self._inv
+        candidates: Optional[set] = None
+        for tok in tokens:
+            hits = set()
+            for word, paths in inverted.items():
+                if tok in word:
+                    hits.update(paths)
+            candidates = hits if candidates is None else candidates & hits
+            if not candidates:
+                break
+        return candidates
+
     def _keyword_navigation(self, query: str) -> str:
-        results = []
         q = query.lower()
+        candidates = self._keyword_candidates(q)
+        results = []
 
         def search_dict(d, path=""):
-            for fname, info in d.get("files", {}).items():
+            for fname, summary, headers in self._iter_files(d):
                 fpath = os.path.join(path, fname)
+                if candidates is not None and fpath not in candidates:
+                    continue
                 if (
                     q in fpath.lower()
-                    or q in info["summary"].lower()
-                    or any(q in s.lower() for s in info["headers"])
+                    or q in summary.lower()
+                    or any(q in s.lower() for s in headers)
                 ):
-                    results.append(
-                        f"File: {fpath}\n  Summary: {info['summary']}\n  Symbols: {info['headers'][:5]}"
-                    )
+                    results.append(self._format_result(fpath, summary, headers))
 
             for dname, sub in d.get("folders", {}).items():
                 search_dict(sub, os.path.join(path, dname))
 
-        search_dict(self.index)
+        if candidates is None or candidates:
+            search_dict(self.index)
         if not results:
             return "No matching files found in structural index."
-        return "\n\n".join(results[:5])
+        return "\n\n".join(results[:MAX_NAVIGATION_RESULTS])
 
     async def _reasoned_navigation(self, query: str) -> str:
         """Uses LLM to navigate the structural index."""
@@ -176,19 +410,27 @@ class PageIndexRAG:
                 + self._keyword_navigation(query)
             )
 
-    def _get_collapsed_index(self, max_depth=2) -> Dict:
-        """Returns a simplified version of the index for LLM context."""
+    def _get_collapsed_index(self, max_depth=2) -> dict:
+        """Returns a simplified version of the index for LLM context.
+
+        The result is memoized per ``max_depth`` until the index is replaced,
+        rebuilt or has files added, so callers must treat it as read-only.
+        """
+        cached = self._collapsed_cache.get(max_depth)
+        if cached is not None:
+            return cached
 
         def collapse(d, depth):
             if depth > max_depth:
                 return {"note": "Max depth reached"}
             res = {
-                "files": list(d["files"].keys()),
+                "files": [name for name, _, _ in self._iter_files(d)],
                 "folders": {k: collapse(v, depth + 1) for k, v in d["folders"].items()},
             }
             return res
 
-        return collapse(self.index, 0)
+        collapsed = self._collapsed_cache[max_depth] = collapse(self.index, 0)
+        return collapsed
 
     async def get_file_context(self, rel_path: str) -> str:
         """Retrieve actual content snippets for a specific path."""
@@ -197,9 +439,16 @@ class PageIndexRAG:
             return f"Error: File {rel_path} not found."
 
         try:
-            with open(abs_path, "r", encoding="utf-8") as f:
-                # Read first 100 lines for context
-                lines = f.readlines()
-                return "".join(lines[:100])
+            with open(abs_path, "rb") as f, self._map_file(f) as data:
+                # Slice up to the end of the CONTEXT_LINES-th line
+                end = 0
+                for _ in range(CONTEXT_LINES):
+                    nl = data.find(b"\n", end)
+                    if nl == -1:
+                        end = len(data)
+                        break
+                    end = nl + 1
+                content = data[:end].decode("utf-8", errors="replace")
+            return content.replace("\r\n", "\n")
         except Exception as e:
             return f"Error reading file: {e}"
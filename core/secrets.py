@@ -1,11 +1,14 @@
 import os
 import re
-from typing import Dict, Optional
+from typing import Optional
+
+_PLACEHOLDER_RE = re.compile(r"\{\{([A-Z0-9_]+)\}\}", re.ASCII)
+
 
 class SecretManager:
     def __init__(self, secrets_dir: str = "secrets"):
         self.secrets_dir = secrets_dir
-        self.secrets: Dict[str, str] = {}
+        self.secrets: dict[str, str] = {}
         self._load_from_env()
         self._load_from_files()
 
@@ -21,11 +24,13 @@ class SecretManager:
         if not os.path.exists(self.secrets_dir):
             return
         
-        for filename in os.listdir(self.secrets_dir):
-            file_path = os.path.join(self.secrets_dir, filename)
-            if os.path.isfile(file_path):
-                with open(file_path, 'r') as f:
-                    self.secrets[filename] = f.read().strip()
+        # DirEntry.is_file() answers from the cached d_type, so only symlinks
+        # (e.g. mounted Kubernetes secrets) cost an extra stat
+        with os.scandir(self.secrets_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    with open(entry.path, 'r') as f:
+                        self.secrets[entry.name] = f.read().strip()
 
     def get_secret(self, name: str) -> Optional[str]:
         return self.secrets.get(name)
@@ -36,8 +41,8 @@ class SecretManager:
             secret_name = match.group(1)
             val = self.secrets.get(secret_name)
             return val if val is not None else match.group(0)
-        
-        return re.sub(r"\{\{([A-Z0-9_]+)\}\}", replace, text)
+
+        return _PLACEHOLDER_RE.sub(replace, text)
 
     def scrub_secrets(self, text: str) -> str:
         """Replace actual secret values with placeholders in text (for logging)"""
@@ -5,6 +5,8 @@ Tests for PageIndexRAG
 import pytest
 import tempfile
 import os
+import sys
+import json
 from unittest.mock import MagicMock, AsyncMock, patch
 
 from core.rag.pageindex import PageIndexRAG
@@ -82,9 +84,12 @@ class TestPageIndexRAG:
         assert "folders" in page_index.index
 
         # Check that files were indexed
-        assert "main.py" in page_index.index["folders"]["src"]["files"]
-        assert "utils.js" in page_index.index["folders"]["src"]["files"]
-        assert "README.md" in page_index.index["folders"]["docs"]["files"]
+        src_files = page_index.index["folders"]["src"]["files"]
+        assert "main.py" in src_files["names"]
+        assert "utils.js" in src_files["names"]
+        assert "README.md" in page_index.index["folders"]["docs"]["files"]["names"]
+        assert len(src_files["summaries"]) == len(src_files["names"])
+        assert page_index.index["version"] == 2
 
         # Check that cache was saved
         assert os.path.exists(page_index.index_path)
@@ -101,6 +106,9 @@ class TestPageIndexRAG:
         await page_index.build_index(force_rebuild=False)
 
         assert page_index.index == original_index
+        loaded = page_index.index["folders"]["src"]["files"]
+        calc = loaded["headers"][loaded["names"].index("main.py")][0]
+        assert calc is sys.intern("Calculator")
 
     def test_extract_symbols_python(self, page_index):
         """Test symbol extraction for Python files"""
@@ -179,6 +187,40 @@ Fourth line
         assert "Calculator" in result
         assert "main.py" in result
 
+    @pytest.mark.asyncio
+    async def test_keyword_navigation_uses_inverted_index(self, page_index):
+        """Test the postings narrow the scan without changing its results"""
+        tests_dir = os.path.join(page_index.root_dir, "tests")
+        os.makedirs(tests_dir)
+        with open(os.path.join(tests_dir, "test_foo.py"), "w") as f:
+            f.write("def test_add():\n    pass\n")
+        await page_index.build_index(force_rebuild=True)
+        main_path = os.path.join("src", "main.py")
+
+        queries = ["calculator", "Calcul", "test", "add", "src/ma", "zzz", "."]
+        indexed = {q: page_index._keyword_navigation(q) for q in queries}
+        assert page_index._inv["calculator"] == [main_path]
+        with patch.object(page_index, "_keyword_candidates", return_value=None):
+            scanned = {q: page_index._keyword_navigation(q) for q in queries}
+
+        assert indexed == scanned
+        assert os.path.join("tests", "test_foo.py") in indexed["test"]
+        assert main_path in indexed["Calcul"]
+
+    @pytest.mark.asyncio
+    async def test_keyword_postings_follow_index_edits(self, page_index):
+        """Test postings are rebuilt after files are added and never cached"""
+        await page_index.build_index(force_rebuild=True)
+        assert "widget" not in page_index._keyword_navigation("widget")
+        with open(page_index.index_path) as f:
+            assert "_inv" not in json.load(f)
+
+        src = page_index.index["folders"]["src"]
+        page_index._append_file(src, "widget.py", 1, ["Widget"], "widget impl")
+        assert os.path.join("src", "widget.py") in page_index._keyword_navigation(
+            "widget"
+        )
+
     @pytest.mark.asyncio
     async def test_navigate_with_llm(self, page_index):
         """Test navigation with LLM"""
@@ -219,6 +261,20 @@ Fourth line
         assert "Calculator" in result
         assert "main.py" in result
 
+    def test_keyword_navigation_columnar(self, page_index):
+        """Test keyword navigation over the columnar (v2) folder layout"""
+        page_index.index = page_index._new_folder()
+        src = page_index._new_folder()
+        page_index._set_folder_files(
+            src,
+            {"main.py": {"summary": "Calculator impl", "headers": ["Calculator"]}},
+        )
+        page_index.index["folders"]["src"] = src
+
+        result = page_index._keyword_navigation("Calculator")
+        assert "main.py" in result
+        assert src["files"]["names"] == ["main.py"]
+
     def test_keyword_navigation_no_results(self, page_index):
         """Test keyword navigation with no matches"""
         page_index.index = {"files": {}, "folders": {}}
@@ -267,6 +323,34 @@ Fourth line
         # Check depth limiting
         assert "note" in collapsed["folders"]["src"]["folders"]["sub"]
 
+    def test_get_collapsed_index_memoized(self, page_index):
+        """Test collapsed views are cached until the index is replaced"""
+        page_index.index = {"files": {}, "folders": {}}
+        first = page_index._get_collapsed_index(max_depth=1)
+        assert page_index._get_collapsed_index(max_depth=1) is first
+        assert page_index._get_collapsed_index(max_depth=2) is not first
+
+        page_index.index = {
+            "files": {"new.py": {"summary": "", "headers": []}},
+            "folders": {},
+        }
+        assert page_index._get_collapsed_index(max_depth=1)["files"] == ["new.py"]
+
+    def test_get_collapsed_index_sees_in_place_changes(self, page_index):
+        """Test appending or migrating in place drops stale collapsed views"""
+        page_index.index = {"files": {}, "folders": {}}
+        assert page_index._get_collapsed_index(max_depth=1)["files"] == []
+
+        page_index._append_file(page_index.index, "added.py", 1, [], "")
+        assert page_index._get_collapsed_index(max_depth=1)["files"] == ["added.py"]
+
+        v1 = {"files": {}, "folders": {}}
+        page_index.index = v1
+        assert page_index._get_collapsed_index(max_depth=1)["files"] == []
+        v1["files"]["late.py"] = {"summary": "", "headers": []}
+        page_index._migrate_v1_to_v2(v1)
+        assert page_index._get_collapsed_index(max_depth=1)["files"] == ["late.py"]
+
     @pytest.mark.asyncio
     async def test_get_file_context(self, temp_dir):
         """Test file context retrieval"""
@@ -335,6 +419,70 @@ async def test_walk_and_index_read_error(page_index, temp_dir):
         assert "unreadable.py" not in page_index.index["files"]
 
 
+@pytest.mark.asyncio
+async def test_build_index_migrates_v1_cache(page_index):
+    """Test a cached v1 (per-file dict) index is upgraded on load"""
+    v1_index = {
+        "root": page_index.root_dir,
+        "files": {"a.py": {"size": 3, "summary": "s", "headers": ["A"]}},
+        "folders": {"src": {"files": {}, "folders": {}}},
+    }
+    with open(page_index.index_path, "w") as f:
+        json.dump(v1_index, f)
+
+    await page_index.build_index()
+
+    assert page_index.index["version"] == 2
+    assert page_index.index["files"] == {
+        "names": ["a.py"],
+        "sizes": [3],
+        "summaries": ["s"],
+        "headers": [["A"]],
+        "hashes": [""],
+    }
+    assert page_index.index["folders"]["src"]["files"]["names"] == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_reuses_unchanged_files(page_index, temp_dir):
+    """Test a forced rebuild only re-extracts files whose content changed"""
+    await page_index.build_index(force_rebuild=True)
+    digests = page_index.index["folders"]["src"]["files"]["hashes"]
+    assert all(len(d) == 16 for d in digests)
+
+    with open(os.path.join(temp_dir, "src", "main.py"), "a") as f:
+        f.write("\ndef extra():\n    pass\n")
+
+    with patch.object(
+        page_index, "_extract_symbols", wraps=page_index._extract_symbols
+    ) as mock_extract:
+        await page_index.build_index(force_rebuild=True)
+
+    extracted = [c.args[1] for c in mock_extract.call_args_list]
+    assert "main.py" in extracted
+    assert "utils.js" not in extracted
+    assert "README.md" not in extracted
+    src_files = page_index.index["folders"]["src"]["files"]
+    assert "extra" in src_files["headers"][src_files["names"].index("main.py")]
+
+
+@pytest.mark.asyncio
+async def test_forced_rebuild_reuses_cached_hashes(page_index, temp_dir):
+    """Test a forced rebuild in a new process reuses entries from the cache"""
+    await page_index.build_index(force_rebuild=True)
+    restarted = PageIndexRAG(temp_dir)
+
+    with patch.object(
+        restarted, "_extract_symbols", wraps=restarted._extract_symbols
+    ) as mock_extract:
+        await restarted.build_index(force_rebuild=True)
+
+    extracted = [c.args[1] for c in mock_extract.call_args_list]
+    for name in ("main.py", "utils.js", "README.md"):
+        assert name not in extracted
+    assert restarted.index["folders"] == page_index.index["folders"]
+
+
 @pytest.mark.asyncio
 async def test_navigate_auto_build_index(page_index):
     """Test navigate calls build_index if index is empty (line 110)"""
@@ -2,6 +2,8 @@
 
 import pytest
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 from core.projects import ProjectManager
 from core.secrets import SecretManager
@@ -30,6 +32,46 @@ class TestProjectManager:
         pm.delete_project("proj_to_del")
         assert not os.path.exists(ctx.base_path)
 
+    @pytest.mark.parametrize("threshold,parallel", [(3, True), (10_000, False)])
+    def test_delete_project_single_walk(self, tmp_path, threshold, parallel):
+        """Test small trees go to shutil.rmtree and large ones via the pool"""
+        pm = ProjectManager(str(tmp_path))
+        ctx = pm.create_project("big")
+        nested = ctx.files_path / "a" / "b"
+        nested.mkdir(parents=True)
+        for i in range(5):
+            (nested / f"f{i}.txt").write_text("x")
+        (ctx.files_path / "link").symlink_to(nested, target_is_directory=True)
+
+        with (
+            patch("core.projects.PARALLEL_DELETE_THRESHOLD", threshold),
+            patch(
+                "core.projects.ThreadPoolExecutor", wraps=ThreadPoolExecutor
+            ) as mock_pool,
+            patch("core.projects.shutil.rmtree", wraps=shutil.rmtree) as mock_rmtree,
+        ):
+            pm.delete_project("big")
+
+        assert mock_pool.called is parallel
+        assert mock_rmtree.called is not parallel
+        assert not os.path.exists(ctx.base_path)
+        assert os.path.exists(tmp_path / "projects")
+
+    def test_delete_project_rejects_symlinked_root(self, tmp_path):
+        """Test a project that is a symlink is refused before anything is removed"""
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "keep.txt").write_text("x")
+        pm = ProjectManager(str(tmp_path))
+        (tmp_path / "projects").mkdir()
+        (tmp_path / "projects" / "evil").symlink_to(outside, target_is_directory=True)
+
+        with pytest.raises(OSError, match="symbolic link"):
+            pm.delete_project("evil")
+
+        assert (outside / "keep.txt").exists()
+        assert (tmp_path / "projects" / "evil").is_symlink()
+
     def test_project_context_methods(self, tmp_path):
         """Test ProjectContext methods (lines 26, 31)"""
         pm = ProjectManager(str(tmp_path))
@@ -43,13 +85,26 @@ class TestProjectManager:
         # list_files (line 31)
         test_file = ctx.files_path / "test.txt"
         test_file.write_text("content")
+        nested = ctx.files_path / "sub" / "deep"
+        nested.mkdir(parents=True)
+        (nested / "inner.txt").write_text("content")
         files = ctx.list_files()
         assert "test.txt" in files
+        assert os.path.join("sub", "deep", "inner.txt") in files
+        assert "sub" not in files
 
         # get_system_prompt not exists (line 27)
         ctx2 = pm.create_project("test_methods2")
         assert ctx2.get_system_prompt() == ""
 
+    def test_list_files_missing_workspace(self, tmp_path):
+        """Test list_files returns [] once the project has been deleted"""
+        pm = ProjectManager(str(tmp_path))
+        ctx = pm.create_project("gone")
+        (ctx.files_path / "a.txt").write_text("x")
+        pm.delete_project("gone")
+        assert ctx.list_files() == []
+
     def test_delete_current_project(self, tmp_path):
         """Test deleting the current project (line 53)"""
         pm = ProjectManager(str(tmp_path))
@@ -103,3 +158,21 @@ class TestSecretManager:
         sm = SecretManager()
         text = "Hello {{NONEXISTENT}}"
         assert sm.inject_secrets(text) == "Hello {{NONEXISTENT}}"
+
+    def test_inject_secrets_literal_braces(self):
+        """Test inject_secrets keeps non-placeholder braces"""
+        sm = SecretManager()
+        sm.secrets["TOKEN"] = "t{0}k"
+        text = '{"auth": "{{TOKEN}}", "x": "{{missing}}", "y": "{{{TOKEN}}}"}'
+        assert (
+            sm.inject_secrets(text)
+            == '{"auth": "t{0}k", "x": "{{missing}}", "y": "{t{0}k}"}'
+        )
+
+    def test_inject_secrets_non_identifier_names(self):
+        """Test secret names that are not identifiers are injected too"""
+        sm = SecretManager()
+        sm.secrets["1KEY"] = "one"
+        sm.secrets["DB_PASS"] = "p4ss"
+        text = "{{1KEY}} {{DB_PASS}} {{NOPE}} {x}"
+        assert sm.inject_secrets(text) == "one p4ss {{NOPE}} {x}"
@@ -2,15 +2,18 @@
 Tests for Push Notification Adapter
 """
 
+import asyncio
+import copy
+import gc
+import inspect
 import pytest
+import sys
+from collections import ChainMap
+from contextlib import ExitStack
+from types import SimpleNamespace
 from unittest.mock import MagicMock, AsyncMock, patch, mock_open
 from datetime import datetime, timedelta
 import json
-import sys
-
-# Mock Firebase messaging functions and classes at module level
-firebase_admin_mock = sys.modules["firebase_admin"]
-firebase_messaging_mock = sys.modules["firebase_admin.messaging"]
 
 
 # Mock response objects
@@ -23,53 +26,11 @@ class MockTopicResponse:
     success_count = 1
 
 
-mock_send_response = MagicMock()
-mock_send_response.success_count = 1
-mock_send_response.failure_count = 0
-
 mock_batch_response = MockBatchResponse()
 mock_topic_response = MockTopicResponse()
 
-# Mock functions
-firebase_messaging_mock.send_each_for_multicast_sync = MagicMock(
-    return_value=mock_batch_response
-)
-firebase_messaging_mock.send = MagicMock(return_value="mock_message_id")
-firebase_messaging_mock.subscribe_to_topic = MagicMock(return_value=mock_topic_response)
-firebase_messaging_mock.unsubscribe_from_topic = MagicMock(
-    return_value=mock_topic_response
-)
-firebase_admin_mock.initialize_app = MagicMock(return_value=MagicMock())
-
-mock_firebase_class = MagicMock()
-firebase_messaging_mock.Notification = mock_firebase_class
-firebase_messaging_mock.AndroidNotification = mock_firebase_class
-firebase_messaging_mock.ApsAlert = mock_firebase_class
-firebase_messaging_mock.WebpushNotification = mock_firebase_class
-firebase_messaging_mock.Message = mock_firebase_class
-firebase_messaging_mock.MulticastMessage = mock_firebase_class
-firebase_messaging_mock.AndroidConfig = mock_firebase_class
-firebase_messaging_mock.APNSConfig = mock_firebase_class
-firebase_messaging_mock.APNSPayload = mock_firebase_class
-firebase_messaging_mock.Aps = mock_firebase_class
-firebase_messaging_mock.WebpushConfig = mock_firebase_class
-
-
-@pytest.fixture(autouse=True)
-def reset_firebase_mocks():
-    """Reset Firebase mocks before each test to ensure clean state"""
-    firebase_messaging_mock.send_each_for_multicast_sync.reset_mock()
-    firebase_messaging_mock.send_each_for_multicast_sync.return_value = (
-        mock_batch_response
-    )
-    firebase_messaging_mock.send.reset_mock()
-    firebase_messaging_mock.send.return_value = "mock_message_id"
-    firebase_messaging_mock.subscribe_to_topic.reset_mock()
-    firebase_messaging_mock.subscribe_to_topic.return_value = mock_topic_response
-    firebase_messaging_mock.unsubscribe_from_topic.reset_mock()
-    firebase_messaging_mock.unsubscribe_from_topic.return_value = mock_topic_response
-    firebase_admin_mock.initialize_app.reset_mock()
-    firebase_admin_mock.initialize_app.return_value = MagicMock()
+# Stand-in for an initialized Firebase app; the adapter only checks it is set
+FIREBASE_APP = MagicMock(name="firebase_app")
 
 
 from adapters.push_notification_adapter import (
@@ -85,88 +46,280 @@ from adapters.push_notification_adapter import (
     Priority,
     NotificationType,
     create_notification,
+    APNS_JWT_TTL,
+    _DEFAULT_CHANNELS,
+    _PENDING_SAVES,
+    _flush_pending_saves,
 )
 
 
-class TestPushDataClasses:
-    """Test Push Notification data classes"""
-
-    def test_push_notification_to_dict_full(self):
-        notif = PushNotification(
-            title="T",
-            body="B",
-            notification_type=NotificationType.MESSAGE,
-            image_url="I",
-            icon="Ic",
-            sound="S",
-            badge=1,
-            tag="Tg",
-            color="C",
-            click_action="A",
-            channel_id="Ch",
-            ticker="Tk",
-            sticky=True,
-            local_only=True,
+@pytest.fixture(scope="module")
+def _adapter_proto():
+    """Prototype adapter built (and its patch entered) once per module"""
+    with patch("os.path.exists", return_value=True):
+        return PushNotificationAdapter(
+            fcm_credential_path="/tmp/fake.json",
+            fcm_project_id="p",
+            apns_key_path="/tmp/key.p8",
+            apns_key_id="k",
+            apns_bundle_id="com.example.app",
+            apns_team_id="t",
+            token_storage_path="/tmp/tokens.json",
         )
-        d = notif.to_dict()
-        assert d["title"] == "T"
-        assert d["sticky"] is True
-
-    def test_android_config_full(self):
-        config = AndroidConfig(
-            collapse_key="C",
-            priority=Priority.HIGH,
-            notification=PushNotification(title="T", body="B"),
-            data={"k": "v"},
-            direct_boot_ok=True,
-            restricted_package_name="P",
+
+
+@pytest.fixture
+def adapter(_adapter_proto):
+    """A copy of the prototype with its own token, channel and handler containers"""
+    fresh = copy.copy(_adapter_proto)
+    for name, value in vars(fresh).items():
+        if isinstance(value, ChainMap):
+            setattr(fresh, name, value.copy())
+        elif isinstance(value, (dict, list)):
+            setattr(fresh, name, copy.deepcopy(value))
+    yield fresh
+    # Don't leave debounced saves pending on the module loop or for atexit
+    if fresh._save_task:
+        fresh._save_task.cancel()
+    _PENDING_SAVES.discard(fresh)
+
+
+@pytest.fixture
+def init_patches(adapter):
+    """Patch the initialize() steps on the adapter; tests override one handle"""
+    with ExitStack() as stack:
+        yield SimpleNamespace(
+            fcm=stack.enter_context(patch.object(adapter, "_initialize_fcm")),
+            ld=stack.enter_context(patch.object(adapter, "_load_tokens")),
+            ch=stack.enter_context(patch.object(adapter, "_create_default_channels")),
         )
-        d = config.to_dict()
-        assert d["collapse_key"] == "C"
-        assert d["priority"] == "high"
-        assert d["notification"]["title"] == "T"
-
-    def test_apns_config_full(self):
-        config = ApnsConfig(
-            bundle_id="B",
-            badge=1,
-            sound="S",
-            category="C",
-            thread_id="T",
-            content_available=True,
-            mutable_content=True,
-            collapse_id="Co",
-            expiration=100,
-            topic="To",
-            custom_data={"k": "v"},
+
+
+@pytest.fixture
+def fcm_patches(adapter):
+    """Patch the _initialize_fcm dependencies; tests override one handle"""
+    adapter.fcm_credential_path = "/valid/path.json"
+    adapter.fcm_project_id = "test-project"
+    module = "adapters.push_notification_adapter"
+    with ExitStack() as stack:
+        yield SimpleNamespace(
+            exists=stack.enter_context(
+                patch(f"{module}.os.path.exists", return_value=True)
+            ),
+            cert=stack.enter_context(patch(f"{module}.credentials.Certificate")),
+            init=stack.enter_context(patch(f"{module}.firebase_admin.initialize_app")),
         )
-        d = config.to_dict()
-        assert d["aps"]["badge"] == 1
-        assert d["aps"]["content-available"] == 1
-        assert d["k"] == "v"
-
-    def test_webpush_config_full(self):
-        config = WebpushConfig(
-            notification=PushNotification(title="T", body="B"),
-            data={"k": "v"},
-            headers={"h": "v"},
-            ttl=100,
+
+
+@pytest.fixture(autouse=True)
+def printed(monkeypatch):
+    """Silence the adapter's print() and collect the lines it would have written"""
+    lines = []
+    monkeypatch.setattr(
+        "adapters.push_notification_adapter.print",
+        lambda *args, **kwargs: lines.append(" ".join(map(str, args))),
+        raising=False,
+    )
+    return lines
+
+
+@pytest.fixture(autouse=True)
+def fcm_send(monkeypatch):
+    """messaging.send patched once per test; tests reconfigure this handle"""
+    send = MagicMock(return_value="mock_message_id")
+    monkeypatch.setattr("adapters.push_notification_adapter.messaging.send", send)
+    return send
+
+
+class FakeApnsClient:
+    """Stand-in for httpx.AsyncClient; delete() returns the shared resp"""
+
+    resp = SimpleNamespace(status_code=204)
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def delete(self, *args, **kwargs):
+        return FakeApnsClient.resp
+
+
+class FakeAioFile:
+    """Stand-in for the async file returned by aiofiles.open()"""
+
+    def __init__(self, data):
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def read(self):
+        return self.data
+
+
+@pytest.fixture
+def apns_key(adapter, monkeypatch):
+    """Serve "key_data" as the APNS key via a fake aiofiles.open() in the adapter"""
+    adapter.apns_key_path = "/tmp/key.p8"
+    adapter.apns_key_id = "keyid"
+    adapter.apns_team_id = "teamid"
+    monkeypatch.setattr(
+        "adapters.push_notification_adapter.aiofiles.open",
+        lambda *args, **kwargs: FakeAioFile("key_data"),
+    )
+
+
+async def _fake_apns_jwt():
+    return "jwt"
+
+
+@pytest.fixture
+def apns_client(monkeypatch):
+    """Install FakeApnsClient as httpx.AsyncClient with a 204 response"""
+    FakeApnsClient.resp.status_code = 204
+    monkeypatch.setattr("httpx.AsyncClient", FakeApnsClient)
+    return FakeApnsClient
+
+
+@pytest.fixture(scope="session")
+def notif():
+    """Shared read-only notification; tests never mutate it"""
+    return create_notification("T", "B")
+
+
+@pytest.fixture(scope="session")
+def notif_badged():
+    """Shared read-only notification with a badge count"""
+    return create_notification("T", "B", badge=1)
+
+
+_OK_ASYNC = AsyncMock(return_value=NotificationResult(success=True))
+
+
+@pytest.fixture
+def ok_send():
+    """Shared AsyncMock returning a successful result, reset for each test"""
+    _OK_ASYNC.reset_mock()
+    return _OK_ASYNC
+
+
+_NOW = datetime.now()
+_OLD = _NOW - timedelta(days=40)  # past the default 30-day cleanup cutoff
+
+
+def _make_tokens(specs):
+    """Build a device_tokens dict from (token, platform, user_id, is_active) rows"""
+    return {
+        token: DeviceToken(
+            token, platform, user_id=user_id, is_active=is_active, last_active=_NOW
         )
-        d = config.to_dict()
-        assert d["notification"]["title"] == "T"
-        assert d["ttl"] == 100
+        for token, platform, user_id, is_active in specs
+    }
+
+
+@pytest.fixture(scope="module")
+def user_tokens():
+    """Two read-only tokens for user u1; tests install a shallow copy"""
+    return _make_tokens(
+        [("t1", Platform.ANDROID, "u1", True), ("t2", Platform.IOS, "u1", True)]
+    )
+
+
+class TestPushDataClasses:
+    """Test Push Notification data classes"""
+
+    @pytest.mark.parametrize(
+        "build,expected",
+        [
+            (
+                lambda: PushNotification(
+                    title="T",
+                    body="B",
+                    notification_type=NotificationType.MESSAGE,
+                    image_url="I",
+                    icon="Ic",
+                    sound="S",
+                    badge=1,
+                    tag="Tg",
+                    color="C",
+                    click_action="A",
+                    channel_id="Ch",
+                    ticker="Tk",
+                    sticky=True,
+                    local_only=True,
+                ),
+                {("title",): "T", ("sticky",): True},
+            ),
+            (
+                lambda: AndroidConfig(
+                    collapse_key="C",
+                    priority=Priority.HIGH,
+                    notification=PushNotification(title="T", body="B"),
+                    data={"k": "v"},
+                    direct_boot_ok=True,
+                    restricted_package_name="P",
+                ),
+                {
+                    ("collapse_key",): "C",
+                    ("priority",): "high",
+                    ("notification", "title"): "T",
+                },
+            ),
+            (
+                lambda: ApnsConfig(
+                    bundle_id="B",
+                    badge=1,
+                    sound="S",
+                    category="C",
+                    thread_id="T",
+                    content_available=True,
+                    mutable_content=True,
+                    collapse_id="Co",
+                    expiration=100,
+                    topic="To",
+                    custom_data={"k": "v"},
+                ),
+                {("aps", "badge"): 1, ("aps", "content-available"): 1, ("k",): "v"},
+            ),
+            (
+                lambda: WebpushConfig(
+                    notification=PushNotification(title="T", body="B"),
+                    data={"k": "v"},
+                    headers={"h": "v"},
+                    ttl=100,
+                ),
+                {("notification", "title"): "T", ("ttl",): 100},
+            ),
+        ],
+        ids=["push_notification", "android", "apns", "webpush"],
+    )
+    def test_config_to_dict_full(self, build, expected):
+        d = build().to_dict()
+        for path, value in expected.items():
+            actual = d
+            for key in path:
+                actual = actual[key]
+            assert actual == value and type(actual) is type(value)
 
     def test_device_token(self):
         t = DeviceToken(token="T", platform=Platform.ANDROID, user_id="U")
         d = t.to_dict()
         assert d["token"] == "T"
         assert DeviceToken.from_dict(d).token == "T"
+        assert not hasattr(t, "__dict__")  # slotted: no per-instance dict
 
     def test_notification_result_from_firebase(self):
-        mock_response = MagicMock()
-        mock_response.exception = None
-        mock_response.message_id = "msg123"
-        mock_response.canonical_address_count = 1
+        mock_response = SimpleNamespace(
+            exception=None, message_id="msg123", canonical_address_count=1
+        )
 
         result = NotificationResult.from_firebase(mock_response)
         assert result.success is True
@@ -179,42 +332,150 @@ class TestPushDataClasses:
         assert result.success is False
         assert result.error is not None and "Test error" in result.error
 
+    def test_notification_channel_to_dict(self):
+        """Test NotificationChannel.to_dict() method"""
+        channel = NotificationChannel(
+            id="test_channel",
+            name="Test Channel",
+            description="A test channel",
+            importance=5,
+            enable_vibration=False,
+            enable_lights=False,
+            show_badge=False,
+            vibration_pattern=[100, 200, 300],
+            sound="notification.mp3",
+        )
+        result = channel.to_dict()
+        assert result["channel_id"] == "test_channel"
+        assert result["name"] == "Test Channel"
+        assert result["description"] == "A test channel"
+        assert result["importance"] == 5
+        assert result["enable_vibration"] is False
+        assert result["enable_lights"] is False
+        assert result["show_badge"] is False
+        assert result["vibration_pattern"] == [100, 200, 300]
+        assert result["sound"] == "notification.mp3"
+
+    def test_notification_result_from_firebase_exception_handling(self):
+        """Test NotificationResult.from_firebase with exception handling"""
+        # Mock response with exception
+        mock_response = SimpleNamespace(
+            exception=Exception("Firebase error"), canonical_address_count=None
+        )
+
+        result = NotificationResult.from_firebase(mock_response)
+        assert result.success is False
+        assert result.error == "Firebase error"
+
+        # Mock response without exception but with canonical address count
+        mock_response.exception = None
+        mock_response.canonical_address_count = 1
+        mock_response.message_id = "msg123"
+
+        result = NotificationResult.from_firebase(mock_response)
+        assert result.success is True
+        assert result.message_id == "msg123"
+        assert result.canonical_token is True
+
+    def test_notification_result_from_firebase_getattr_exception(self):
+        """Test NotificationResult.from_firebase with getattr exception on canonical_address_count"""
+        # canonical_address_count > 0 raises TypeError for a bare object()
+        mock_response = SimpleNamespace(
+            exception=None, message_id="msg123", canonical_address_count=object()
+        )
+
+        result = NotificationResult.from_firebase(mock_response)
+        assert result.success is True
+        assert result.message_id == "msg123"
+        assert result.canonical_token is False
+
+
+class TestPushAdapterState:
+    """Test adapter state that needs no event loop"""
+
+    def test_load_save_tokens(self, adapter, tmp_path):
+        m = mock_open(read_data=json.dumps([{"token": "t1", "platform": "android"}]))
+        with patch("builtins.open", m), patch("os.path.exists", return_value=True):
+            adapter._load_tokens()
+            assert "t1" in adapter.device_tokens
+
+        adapter.token_storage_path = str(tmp_path / "tokens.json")
+        adapter._save_tokens()
+        assert [p.name for p in tmp_path.iterdir()] == ["tokens.json"]
+        saved = json.loads((tmp_path / "tokens.json").read_text())
+        assert [t["token"] for t in saved] == ["t1"]
+
+    def test_pending_save_survives_asyncio_run(self, tmp_path):
+        """Test a registration cancelled by asyncio.run is still flushed"""
+        path = tmp_path / "tokens.json"
+
+        async def main():
+            adapter = PushNotificationAdapter(token_storage_path=str(path))
+            assert await adapter.register_token("t1", Platform.ANDROID, "u1")
+
+        asyncio.run(main())
+        gc.collect()
+        assert not path.exists()
+
+        _flush_pending_saves()
+        assert [t["token"] for t in json.loads(path.read_text())] == ["t1"]
+
+    def test_generate_id(self, adapter):
+        """Test _generate_id method"""
+        id1 = adapter._generate_id()
+        id2 = adapter._generate_id()
+        assert isinstance(id1, str)
+        assert len(id1) == 36  # UUID4 length
+        assert id1 != id2  # Should be unique
+
+    def test_create_default_channels(self, adapter):
+        """Test _create_default_channels layers the shared defaults"""
+        assert not adapter.notification_channels
+        adapter._create_default_channels()
+
+        assert "megabot_default" in adapter.notification_channels
+        assert "megabot_alerts" in adapter.notification_channels
+        assert "megabot_messages" in adapter.notification_channels
+        assert "megabot_silent" in adapter.notification_channels
+
+        default_channel = adapter.notification_channels["megabot_default"]
+        assert default_channel.name == "MegaBot Messages"
+        assert default_channel.importance == 4
+
+        assert default_channel is _DEFAULT_CHANNELS["megabot_default"]
+        assert len(adapter.notification_channels) == len(_DEFAULT_CHANNELS)
+
+        # Initializing again keeps a single defaults layer
+        adapter._create_default_channels()
+        assert len(adapter.notification_channels.maps) == 2
+
+    def test_adapter_fixture_copies_nested_state(self, adapter, _adapter_proto):
+        """Test edits inside the fixture's containers never reach the prototype"""
+        adapter._create_default_channels()
+        del adapter.notification_channels["megabot_alerts"]
+        adapter.notification_channels["own"] = NotificationChannel(id="own", name="O")
+        adapter.device_tokens = _make_tokens([("t1", Platform.ANDROID, "u1", True)])
+
+        assert not _adapter_proto.notification_channels
+        assert _adapter_proto._tokens_by_user == {}
+        assert _adapter_proto._tokens_by_platform == {}
+
 
 class TestPushNotificationAdapter:
     """Test Push Notification adapter functionality"""
 
-    @pytest.fixture
-    def adapter(self):
-        with patch("os.path.exists", return_value=True):
-            return PushNotificationAdapter(
-                fcm_credential_path="/tmp/fake.json",
-                fcm_project_id="p",
-                apns_key_path="/tmp/key.p8",
-                apns_key_id="k",
-                apns_bundle_id="com.example.app",
-                apns_team_id="t",
-                token_storage_path="/tmp/tokens.json",
-            )
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-    @pytest.mark.asyncio
-    async def test_initialize_flow(self, adapter):
-        with (
-            patch.object(adapter, "_initialize_fcm"),
-            patch.object(adapter, "_load_tokens"),
-            patch.object(adapter, "_create_default_channels"),
-        ):
-            assert await adapter.initialize() is True
-            assert adapter._is_initialized is True
+    async def test_initialize_flow(self, adapter, init_patches):
+        assert await adapter.initialize() is True
+        assert adapter._is_initialized is True
 
-            # Test exception in initialize
-            with patch.object(
-                adapter, "_initialize_fcm", side_effect=Exception("FCM error")
-            ):
-                assert await adapter.initialize() is False
+        # Test exception in initialize
+        init_patches.fcm.side_effect = Exception("FCM error")
+        assert await adapter.initialize() is False
 
-    @pytest.mark.asyncio
     async def test_token_management(self, adapter):
-        with patch.object(adapter, "_save_tokens") as mock_save:
+        with patch.object(adapter, "_schedule_save") as mock_save:
             # Register
             assert await adapter.register_token("t1", Platform.ANDROID, "u1") is True
             assert "t1" in adapter.device_tokens
@@ -224,41 +485,28 @@ class TestPushNotificationAdapter:
             assert await adapter.unregister_token("t1") is True
             assert "t1" not in adapter.device_tokens
 
-    @pytest.mark.asyncio
-    async def test_send_to_token_platforms(self, adapter):
-        notif = create_notification("T", "B")
-
-        # Android
-        with patch.object(adapter, "_send_fcm", new_callable=AsyncMock) as m:
-            m.return_value = NotificationResult(success=True)
-            await adapter.send_to_token("t1", notif, platform=Platform.ANDROID)
-            m.assert_called_once()
-
-        # iOS
-        with patch.object(adapter, "_send_apns", new_callable=AsyncMock) as m:
-            m.return_value = NotificationResult(success=True)
-            await adapter.send_to_token("t1", notif, platform=Platform.IOS)
-            m.assert_called_once()
-
-        # Web
-        with patch.object(adapter, "_send_webpush", new_callable=AsyncMock) as m:
-            m.return_value = NotificationResult(success=True)
-            await adapter.send_to_token("t1", notif, platform=Platform.WEB)
-            m.assert_called_once()
-
-        # Unknown
+    @pytest.mark.parametrize(
+        "platform,method",
+        [
+            (Platform.ANDROID, "_send_fcm"),
+            (Platform.IOS, "_send_apns"),
+            (Platform.WEB, "_send_webpush"),
+        ],
+    )
+    async def test_send_to_token_platforms(
+        self, adapter, platform, method, notif, ok_send
+    ):
+        with patch.object(adapter, method, ok_send):
+            await adapter.send_to_token("t1", notif, platform=platform)
+            ok_send.assert_called_once()
+
+    async def test_send_to_token_unknown_platform(self, adapter, notif):
         res = await adapter.send_to_token("t1", notif, platform="unknown")
         assert res.success is False
 
-    @pytest.mark.asyncio
-    async def test_send_to_user_multi(self, adapter):
-        adapter.device_tokens = {
-            "t1": DeviceToken("t1", Platform.ANDROID, user_id="u1"),
-            "t2": DeviceToken("t2", Platform.IOS, user_id="u1"),
-        }
-        notif = create_notification("T", "B")
-        with patch.object(adapter, "send_to_token", new_callable=AsyncMock) as m:
-            m.return_value = NotificationResult(success=True)
+    async def test_send_to_user_multi(self, adapter, notif, user_tokens, ok_send):
+        adapter.device_tokens = dict(user_tokens)
+        with patch.object(adapter, "send_to_token", ok_send) as m:
             res = await adapter.send_to_user("u1", notif)
             assert res.success is True
             assert m.call_count == 2
@@ -267,154 +515,138 @@ class TestPushNotificationAdapter:
             res = await adapter.send_to_user("u2", notif)
             assert res.success is False
 
-    @pytest.mark.asyncio
-    async def test_broadcast_methods(self, adapter):
-
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
+    async def test_broadcast_methods(self, adapter, notif, fcm_send, monkeypatch):
 
-        with patch(
-            "adapters.push_notification_adapter.messaging.send_each_for_multicast_sync"
-        ) as m:
-            m.return_value = mock_batch_response
-            await adapter.send_broadcast(notif, topic="news")
-            await adapter.send_broadcast(notif, condition="'A' in topics", dry_run=True)
-            assert m.call_count == 2
-
-        with patch("adapters.push_notification_adapter.messaging.send") as m:
-            m.return_value = "msg_id"
-            await adapter.send_to_topic("news", notif)
-            await adapter.send_to_topic("news", notif, dry_run=True)
-            assert m.call_count == 1  # dry_run doesn't call messaging.send
+        adapter._firebase_app = FIREBASE_APP
+        multicast = MagicMock(return_value=mock_batch_response)
+        monkeypatch.setattr(
+            "adapters.push_notification_adapter.messaging.send_each_for_multicast",
+            multicast,
+        )
+        unsubscribe = MagicMock(side_effect=Exception("unsubscribe error"))
+        monkeypatch.setattr(
+            "adapters.push_notification_adapter.messaging.unsubscribe_from_topic",
+            unsubscribe,
+        )
 
-        with patch(
-            "adapters.push_notification_adapter.messaging.unsubscribe_from_topic"
-        ) as m:
-            m.side_effect = Exception("unsubscribe error")
-            result = await adapter.unsubscribe_from_topic(["t1"], "news")
-            assert result is False
+        await adapter.send_broadcast(notif, topic="news")
+        await adapter.send_broadcast(notif, condition="'A' in topics", dry_run=True)
+        assert multicast.call_count == 2
 
-    @pytest.mark.asyncio
-    async def test_apns_void(self, adapter):
+        await adapter.send_to_topic("news", notif)
+        await adapter.send_to_topic("news", notif, dry_run=True)
+        assert fcm_send.call_count == 1  # dry_run doesn't call messaging.send
 
-        mock_res = MagicMock()
-        mock_res.status_code = 204
+        result = await adapter.unsubscribe_from_topic(["t1"], "news")
+        assert result is False
 
-        with (
-            patch("httpx.AsyncClient.delete", new_callable=AsyncMock) as m,
-            patch.object(adapter, "_get_apns_jwt", new_callable=AsyncMock) as mj,
-        ):
-            m.return_value = mock_res
-            mj.return_value = "jwt"
+    async def test_apns_void(self, adapter, apns_client):
+        with patch.object(adapter, "_get_apns_jwt", _fake_apns_jwt):
             res = await adapter.send_apns_void("t", "b")
             assert res.success is True
 
             # Test failure
-            mock_res.status_code = 400
+            apns_client.resp.status_code = 400
             res = await adapter.send_apns_void("t", "b")
             assert res.success is False
 
-    @pytest.mark.asyncio
-    async def test_send_fcm_no_firebase_app(self, adapter):
-        """Test _send_fcm without Firebase app"""
+    @pytest.mark.parametrize(
+        "call",
+        [
+            lambda a, n: a.send_broadcast(n, topic="news"),
+            lambda a, n: a.send_to_topic("news", n),
+            lambda a, n: a._send_fcm("t", n),
+        ],
+        ids=["send_broadcast", "send_to_topic", "_send_fcm"],
+    )
+    async def test_send_no_firebase_app(self, adapter, notif, call):
+        """Test FCM sends without Firebase app"""
         adapter._firebase_app = None
-        notif = create_notification("T", "B")
 
-        result = await adapter._send_fcm("t", notif)
+        result = await call(adapter, notif)
         assert result.success is False
-        assert result.error == "FCM not initialized"
+        assert "FCM not initialized" in result.error
 
-    @pytest.mark.asyncio
-    async def test_send_fcm_internal_send(self, adapter):
+    @pytest.mark.parametrize("method", ["subscribe_to_topic", "unsubscribe_from_topic"])
+    async def test_topic_subscription_no_firebase_app(self, adapter, method):
+        """Test topic (un)subscription without Firebase app"""
+        adapter._firebase_app = None
 
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B", badge=1)
+        assert await getattr(adapter, method)(["t1"], "news") is False
 
-        with patch("adapters.push_notification_adapter.messaging.send") as m:
-            m.return_value = "id"
-            res = await adapter._send_fcm("t", notif)
-            assert res.success is True
+    async def test_send_fcm_internal_send(self, adapter, notif_badged, fcm_send):
+
+        adapter._firebase_app = FIREBASE_APP
 
-            # Test unregistered error
-            m.side_effect = Exception("UNREGISTERED token")
-            with patch.object(
-                adapter, "unregister_token", new_callable=AsyncMock
-            ) as mu:
-                res = await adapter._send_fcm("t", notif)
-                assert res.success is False
-                mu.assert_called_once()
-                assert res.success is False
-                mu.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_apns_internal_send(self, adapter):
-
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
+        res = await adapter._send_fcm("t", notif_badged)
+        assert res.success is True
+
+        # Test unregistered error
+        fcm_send.side_effect = Exception("UNREGISTERED token")
+        with patch.object(adapter, "unregister_token", new_callable=AsyncMock) as mu:
+            res = await adapter._send_fcm("t", notif_badged)
+            assert res.success is False
+            mu.assert_called_once()
+
+    async def test_apns_internal_send(self, adapter, notif):
+
+        adapter._firebase_app = FIREBASE_APP
         adapter.apns_bundle_id = "com.test"
 
-        with patch("firebase_admin.messaging.send") as m:
-            m.return_value = "id"
-            res = await adapter._send_apns("t", notif)
-            assert res.success is True
+        res = await adapter._send_apns("t", notif)
+        assert res.success is True
 
-    @pytest.mark.asyncio
-    async def test_send_broadcast_multicast_message(self, adapter):
+    async def test_send_broadcast_multicast_message(self, adapter, notif, monkeypatch):
         """Test send_broadcast with MulticastMessage (no topic/condition)"""
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
+        adapter._firebase_app = FIREBASE_APP
+        multicast = MagicMock(
+            return_value=SimpleNamespace(success_count=1, failure_count=0)
+        )
+        monkeypatch.setattr(
+            "adapters.push_notification_adapter.messaging.send_each_for_multicast",
+            multicast,
+        )
 
         # Register a token first
         await adapter.register_token("test_token", Platform.ANDROID, "user123")
 
-        with patch(
-            "adapters.push_notification_adapter.messaging.send_each_for_multicast_sync"
-        ) as m:
-            m.return_value = MagicMock(success_count=1, failure_count=0)
-            res = await adapter.send_broadcast(notif)
-            assert res.success is True
-            m.assert_called_once()
+        res = await adapter.send_broadcast(notif)
+        assert res.success is True
+        multicast.assert_called_once()
 
         with patch("os.path.exists", return_value=False):
             adapter._initialize_fcm()
             # Should not call initialize_app if creds don't exist
 
-    def test_load_save_tokens(self, adapter):
-        m = mock_open(read_data=json.dumps([{"token": "t1", "platform": "android"}]))
-        with patch("builtins.open", m), patch("os.path.exists", return_value=True):
-            adapter._load_tokens()
-            assert "t1" in adapter.device_tokens
+    async def test_schedule_save_coalesces(self, adapter, monkeypatch):
+        """Test back-to-back token changes are persisted by a single save"""
+        monkeypatch.setattr("adapters.push_notification_adapter.TOKEN_SAVE_DELAY", 0)
+        with patch.object(adapter, "_save_tokens") as mock_save:
+            await adapter.register_token("t1", Platform.ANDROID, "u1")
+            await adapter.register_token("t2", Platform.IOS, "u1")
+            await adapter.unregister_token("t1")
+            mock_save.assert_not_called()
+
+            await adapter._save_task
+            mock_save.assert_called_once()
+        assert adapter not in _PENDING_SAVES
+
+    async def test_pending_save_flushed_at_exit(self, adapter):
+        """Test a save still waiting on TOKEN_SAVE_DELAY is written by the hook"""
+        with patch.object(adapter, "_save_tokens") as mock_save:
+            await adapter.register_token("t1", Platform.ANDROID, "u1")
+            assert adapter in _PENDING_SAVES
 
-        m = mock_open()
-        with patch("builtins.open", m), patch("os.makedirs"):
-            adapter._save_tokens()
-            m().write.assert_called()
+            _flush_pending_saves()
+            mock_save.assert_called_once()
+        assert adapter not in _PENDING_SAVES
 
-    @pytest.mark.asyncio
     async def test_shutdown(self, adapter):
         with patch.object(adapter, "_save_tokens"), patch("firebase_admin.delete_app"):
-            adapter._firebase_app = MagicMock()
+            adapter._firebase_app = FIREBASE_APP
             adapter.shutdown()
             assert adapter._firebase_app is None
 
-
-class TestPushNotificationAdapterBranches:
-    """Test Push Notification adapter branch coverage"""
-
-    @pytest.fixture
-    def adapter(self):
-        with patch("os.path.exists", return_value=True):
-            return PushNotificationAdapter(
-                fcm_credential_path="/tmp/fake.json",
-                fcm_project_id="p",
-                apns_key_path="/tmp/key.p8",
-                apns_key_id="k",
-                apns_bundle_id="com.example.app",
-                apns_team_id="t",
-                token_storage_path="/tmp/tokens.json",
-            )
-
-    @pytest.mark.asyncio
     async def test_initialize_fcm_no_credentials(self, adapter):
         """Test FCM initialization with no credentials path"""
         adapter.fcm_credential_path = None
@@ -422,35 +654,34 @@ class TestPushNotificationAdapterBranches:
             adapter._initialize_fcm()
             assert adapter._firebase_app is None
 
-    @pytest.mark.asyncio
-    async def test_load_tokens_invalid_json(self, adapter):
+    async def test_load_tokens_invalid_json(self, adapter, monkeypatch):
         """Test loading tokens with invalid JSON"""
-        with patch("builtins.open", mock_open(read_data="invalid json")):
-            with patch("os.path.exists", return_value=True):
-                with patch(
-                    "json.load", side_effect=json.JSONDecodeError("Invalid", "", 0)
-                ):
-                    adapter._load_tokens()
-                    # Should handle error gracefully
-                    assert len(adapter.device_tokens) == 0
-
-    @pytest.mark.asyncio
-    async def test_load_tokens_file_not_found(self, adapter):
+        monkeypatch.setattr("builtins.open", mock_open(read_data="invalid json"))
+        monkeypatch.setattr("os.path.exists", MagicMock(return_value=True))
+        monkeypatch.setattr(
+            "json.load",
+            MagicMock(side_effect=json.JSONDecodeError("Invalid", "", 0)),
+        )
+        adapter._load_tokens()
+        # Should handle error gracefully
+        assert len(adapter.device_tokens) == 0
+
+    async def test_load_tokens_file_not_found(self, adapter, monkeypatch):
         """Test loading tokens when file doesn't exist"""
-        with patch("os.path.exists", return_value=False):
-            adapter._load_tokens()
-            # Should handle gracefully
-            assert len(adapter.device_tokens) == 0
+        monkeypatch.setattr("os.path.exists", MagicMock(return_value=False))
+        adapter._load_tokens()
+        # Should handle gracefully
+        assert len(adapter.device_tokens) == 0
 
-    @pytest.mark.asyncio
-    async def test_save_tokens_permission_error(self, adapter):
+    async def test_save_tokens_permission_error(self, adapter, monkeypatch):
         """Test saving tokens with permission error"""
         adapter.device_tokens = {"t1": DeviceToken("t1", Platform.ANDROID, "u1")}
-        with patch("os.makedirs", side_effect=PermissionError("No permission")):
-            adapter._save_tokens()
-            # Should handle error gracefully
+        monkeypatch.setattr(
+            "os.makedirs", MagicMock(side_effect=PermissionError("No permission"))
+        )
+        adapter._save_tokens()
+        # Should handle error gracefully
 
-    @pytest.mark.asyncio
     async def test_register_token_handler_errors(self, adapter):
         """Test token registration with handler errors"""
         failing_handler = MagicMock(side_effect=ValueError("handler failed"))
@@ -463,7 +694,6 @@ class TestPushNotificationAdapterBranches:
         assert "t1" in adapter.device_tokens
         failing_handler.assert_called()
 
-    @pytest.mark.asyncio
     async def test_unregister_token_handler_errors(self, adapter):
         """Test token unregistration with handler errors"""
         adapter.device_tokens = {"t1": DeviceToken("t1", Platform.ANDROID, "u1")}
@@ -475,89 +705,34 @@ class TestPushNotificationAdapterBranches:
         assert "t1" not in adapter.device_tokens
         failing_handler.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_send_broadcast_no_firebase_app(self, adapter):
-        """Test broadcast send without Firebase app"""
-        adapter._firebase_app = None
-        notif = create_notification("T", "B")
-
-        result = await adapter.send_broadcast(notif, topic="news")
-        assert result.success is False
-        assert "FCM not initialized" in result.error
-
-    @pytest.mark.asyncio
-    async def test_send_to_topic_no_firebase_app(self, adapter):
-        """Test topic send without Firebase app"""
-        adapter._firebase_app = None
-        notif = create_notification("T", "B")
-
-        result = await adapter.send_to_topic("news", notif)
-        assert result.success is False
-        assert "FCM not initialized" in result.error
-
-    @pytest.mark.asyncio
-    async def test_subscribe_to_topic_no_firebase_app(self, adapter):
-        """Test topic subscription without Firebase app"""
-        adapter._firebase_app = None
-
-        result = await adapter.subscribe_to_topic(["t1"], "news")
-        assert result is False
-
-    @pytest.mark.asyncio
-    async def test_send_apns_void_http_errors(self, adapter):
+    @pytest.mark.parametrize("status", [400, 500])
+    async def test_send_apns_void_http_errors(self, adapter, apns_client, status):
         """Test APNS void with different HTTP status codes"""
+        apns_client.resp.status_code = status
 
-        notif = create_notification("T", "B")
-
-        # Test 400 error
-        mock_res = MagicMock()
-        mock_res.status_code = 400
-
-        with (
-            patch("httpx.AsyncClient.delete", new_callable=AsyncMock) as m,
-            patch.object(adapter, "_get_apns_jwt", new_callable=AsyncMock) as mj,
-        ):
-            m.return_value = mock_res
-            mj.return_value = "jwt"
+        with patch.object(adapter, "_get_apns_jwt", _fake_apns_jwt):
             res = await adapter.send_apns_void("t", "b")
             assert res.success is False
 
-        # Test 500 error
-        mock_res.status_code = 500
-        res = await adapter.send_apns_void("t", "b")
-        assert res.success is False
-
-    @pytest.mark.asyncio
-    async def test_send_fcm_invalid_token_errors(self, adapter):
+    @pytest.mark.parametrize("err", ["INVALID_ARGUMENT", "SENDER_ID_MISMATCH"])
+    async def test_send_fcm_invalid_token_errors(self, adapter, notif, fcm_send, err):
         """Test FCM send with various token errors"""
+        adapter._firebase_app = FIREBASE_APP
+        fcm_send.side_effect = Exception(err)
 
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
-
-        with patch("adapters.push_notification_adapter.messaging.send") as m:
-            # Test INVALID_ARGUMENT error
-            m.side_effect = Exception("INVALID_ARGUMENT")
-            res = await adapter._send_fcm("t", notif)
-            assert res.success is False
-
-            # Test SENDER_ID_MISMATCH error
-            m.side_effect = Exception("SENDER_ID_MISMATCH")
-            res = await adapter._send_fcm("t", notif)
-            assert res.success is False
+        res = await adapter._send_fcm("t", notif)
+        assert res.success is False
 
-    @pytest.mark.asyncio
-    async def test_send_apns_missing_bundle_id(self, adapter):
+    async def test_send_apns_missing_bundle_id(self, adapter, notif):
         """Test APNS send without bundle ID"""
 
-        adapter._firebase_app = MagicMock()
+        adapter._firebase_app = FIREBASE_APP
         adapter.apns_bundle_id = None
-        notif = create_notification("T", "B")
 
         res = await adapter._send_apns("t", notif)
         assert res.success is False
         assert "bundle ID not configured" in res.error
 
-    @pytest.mark.asyncio
     async def test_get_apns_jwt_missing_config(self, adapter):
         """Test APNS JWT generation with missing configuration"""
         # Missing key path
@@ -571,21 +746,22 @@ class TestPushNotificationAdapterBranches:
         res = await adapter._get_apns_jwt()
         assert res == ""
 
-    @pytest.mark.asyncio
-    async def test_get_apns_jwt_file_not_found(self, adapter):
+    async def test_get_apns_jwt_file_not_found(self, adapter, monkeypatch):
         """Test APNS JWT generation with missing key file"""
         adapter.apns_key_path = "/nonexistent/key.p8"
         adapter.apns_key_id = "test_key_id"
         adapter.apns_team_id = "test_team_id"
+        monkeypatch.setattr(
+            "adapters.push_notification_adapter.aiofiles.open",
+            MagicMock(side_effect=FileNotFoundError("File not found")),
+        )
 
-        with patch("builtins.open", side_effect=FileNotFoundError("File not found")):
-            res = await adapter._get_apns_jwt()
-            assert res == ""
+        res = await adapter._get_apns_jwt()
+        assert res == ""
 
-    @pytest.mark.asyncio
     async def test_shutdown_error_handling(self, adapter):
         """Test shutdown with Firebase app deletion errors"""
-        adapter._firebase_app = MagicMock()
+        adapter._firebase_app = FIREBASE_APP
 
         with patch(
             "firebase_admin.delete_app", side_effect=ValueError("App not found")
@@ -594,7 +770,6 @@ class TestPushNotificationAdapterBranches:
             assert adapter._firebase_app is None
             assert adapter._is_initialized is False
 
-    @pytest.mark.asyncio
     async def test_initialize_fcm_credential_error(self, adapter):
         """Test FCM initialization with credential loading error"""
         with (
@@ -608,10 +783,8 @@ class TestPushNotificationAdapterBranches:
             # When cred loading fails, cred becomes None, and initialize_app is called with None
             # This may or may not set _firebase_app depending on Firebase behavior
 
-    @pytest.mark.asyncio
-    async def test_send_to_token_exception_handling(self, adapter):
+    async def test_send_to_token_exception_handling(self, adapter, notif):
         """Test send_to_token with internal exceptions"""
-        notif = create_notification("T", "B")
 
         with patch.object(
             adapter, "_send_fcm", side_effect=Exception("Internal error")
@@ -620,13 +793,9 @@ class TestPushNotificationAdapterBranches:
             assert res.success is False
             assert "Internal error" in res.error
 
-    @pytest.mark.asyncio
-    async def test_send_to_user_exception_handling(self, adapter):
+    async def test_send_to_user_exception_handling(self, adapter, notif, user_tokens):
         """Test send_to_user with internal exceptions"""
-        notif = create_notification("T", "B")
-        adapter.device_tokens = {
-            "t1": DeviceToken("t1", Platform.ANDROID, user_id="u1")
-        }
+        adapter.device_tokens = dict(user_tokens)
 
         with patch.object(
             adapter, "send_to_token", side_effect=Exception("Send failed")
@@ -635,187 +804,72 @@ class TestPushNotificationAdapterBranches:
             assert res.success is False
             assert "Send failed" in res.error
 
-    @pytest.mark.asyncio
-    async def test_send_broadcast_exception_handling(self, adapter):
-        """Test send_broadcast with internal exceptions"""
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
-
-        # Register a token first
-        await adapter.register_token("test_token", Platform.ANDROID, "user123")
-
-        with patch(
-            "adapters.push_notification_adapter.messaging.send_each_for_multicast_sync",
-            side_effect=Exception("Broadcast failed"),
-        ):
-            res = await adapter.send_broadcast(notif)
-            assert res.success is False
-            assert "Broadcast failed" in res.error
-
-    @pytest.mark.asyncio
-    async def test_send_to_topic_exception_handling(self, adapter):
-        """Test send_to_topic with internal exceptions"""
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
-
-        with patch(
-            "adapters.push_notification_adapter.messaging.send",
-            side_effect=Exception("Topic send failed"),
-        ):
-            res = await adapter.send_to_topic("news", notif)
-            assert res.success is False
-            assert "Topic send failed" in res.error
-
-    @pytest.mark.asyncio
-    async def test_subscribe_to_topic_exception_handling(self, adapter):
-        """Test subscribe_to_topic with internal exceptions"""
-        adapter._firebase_app = MagicMock()
-
-        with patch(
-            "adapters.push_notification_adapter.messaging.subscribe_to_topic",
-            side_effect=Exception("Subscribe failed"),
-        ):
-            res = await adapter.subscribe_to_topic(["t1"], "news")
-            assert res is False
-
-    @pytest.mark.asyncio
-    async def test_send_apns_exception_handling(self, adapter):
-        """Test _send_apns with internal exceptions"""
-        adapter._firebase_app = MagicMock()
+    @pytest.mark.parametrize(
+        "target,call,frag",
+        [
+            (
+                "send_each_for_multicast",
+                lambda a, n: a.send_broadcast(n),
+                "Broadcast failed",
+            ),
+            ("send", lambda a, n: a.send_to_topic("news", n), "Topic send failed"),
+            ("send", lambda a, n: a._send_apns("t", n), "APNS failed"),
+            (
+                "subscribe_to_topic",
+                lambda a, n: a.subscribe_to_topic(["t1"], "news"),
+                None,
+            ),
+        ],
+        ids=["send_broadcast", "send_to_topic", "_send_apns", "subscribe_to_topic"],
+    )
+    async def test_messaging_exception_handling(
+        self, adapter, notif, monkeypatch, target, call, frag
+    ):
+        """Test adapter calls when the Firebase messaging call raises"""
+        adapter._firebase_app = FIREBASE_APP
         adapter.apns_bundle_id = "com.example.app"
-        notif = create_notification("T", "B")
-
-        with patch(
-            "adapters.push_notification_adapter.messaging.send",
-            side_effect=Exception("APNS failed"),
-        ):
-            res = await adapter._send_apns("t", notif)
-            assert res.success is False
-            assert "APNS failed" in res.error
-
-    def test_notification_channel_to_dict(self):
-        """Test NotificationChannel.to_dict() method"""
-        channel = NotificationChannel(
-            id="test_channel",
-            name="Test Channel",
-            description="A test channel",
-            importance=5,
-            enable_vibration=False,
-            enable_lights=False,
-            show_badge=False,
-            vibration_pattern=[100, 200, 300],
-            sound="notification.mp3",
+        adapter.device_tokens = {
+            "test_token": DeviceToken("test_token", Platform.ANDROID, "user123")
+        }
+        monkeypatch.setattr(
+            f"adapters.push_notification_adapter.messaging.{target}",
+            MagicMock(side_effect=Exception(frag or "Subscribe failed")),
         )
-        result = channel.to_dict()
-        assert result["channel_id"] == "test_channel"
-        assert result["name"] == "Test Channel"
-        assert result["description"] == "A test channel"
-        assert result["importance"] == 5
-        assert result["enable_vibration"] is False
-        assert result["enable_lights"] is False
-        assert result["show_badge"] is False
-        assert result["vibration_pattern"] == [100, 200, 300]
-        assert result["sound"] == "notification.mp3"
 
-    def test_notification_result_from_firebase_exception_handling(self):
-        """Test NotificationResult.from_firebase with exception handling"""
-        # Mock response with exception
-        mock_response = MagicMock()
-        mock_response.exception = Exception("Firebase error")
-        mock_response.canonical_address_count = None
-
-        result = NotificationResult.from_firebase(mock_response)
-        assert result.success is False
-        assert result.error == "Firebase error"
-
-        # Mock response without exception but with canonical address count
-        mock_response.exception = None
-        mock_response.canonical_address_count = 1
-        mock_response.message_id = "msg123"
-
-        result = NotificationResult.from_firebase(mock_response)
-        assert result.success is True
-        assert result.message_id == "msg123"
-        assert result.canonical_token is True
-
-    @pytest.mark.asyncio
-    async def test_send_broadcast_multicast_message(self, adapter):
-        """Test send_broadcast with MulticastMessage (no topic/condition)"""
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
-
-        # Register a token first
-        await adapter.register_token("test_token", Platform.ANDROID, "user123")
-
-        with patch(
-            "adapters.push_notification_adapter.messaging.send_each_for_multicast_sync"
-        ) as m:
-            m.return_value = MagicMock(success_count=1, failure_count=0)
-            res = await adapter.send_broadcast(notif)
-            assert res.success is True
-            m.assert_called_once()
+        res = await call(adapter, notif)
+        if frag is None:
+            assert res is False
+        else:
+            assert res.success is False
+            assert frag in res.error
 
-    @pytest.mark.asyncio
-    async def test_send_fcm_dry_run(self, adapter):
+    async def test_send_fcm_dry_run(self, adapter, notif, fcm_send):
         """Test _send_fcm dry run handling"""
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
+        adapter._firebase_app = FIREBASE_APP
 
-        with patch("adapters.push_notification_adapter.messaging.send") as m:
-            res = await adapter._send_fcm("t", notif, dry_run=True)
-            assert res.success is True
-            m.assert_not_called()
+        res = await adapter._send_fcm("t", notif, dry_run=True)
+        assert res.success is True
+        fcm_send.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_send_apns_dry_run(self, adapter):
+    async def test_send_apns_dry_run(self, adapter, notif, fcm_send):
         """Test _send_apns dry run handling"""
-        adapter._firebase_app = MagicMock()
+        adapter._firebase_app = FIREBASE_APP
         adapter.apns_bundle_id = "com.example.app"
-        notif = create_notification("T", "B")
-
-        with patch("adapters.push_notification_adapter.messaging.send") as m:
-            res = await adapter._send_apns("t", notif, dry_run=True)
-            assert res.success is True
-            m.assert_not_called()
-
-    def test_generate_id(self, adapter):
-        """Test _generate_id method"""
-        id1 = adapter._generate_id()
-        id2 = adapter._generate_id()
-        assert isinstance(id1, str)
-        assert len(id1) == 36  # UUID4 length
-        assert id1 != id2  # Should be unique
-
-    @pytest.mark.asyncio
-    async def test_main_function_asyncio_run(self):
-        """Test that main function can be called with asyncio.run"""
-        # This tests line 1208 where asyncio.run(main()) is called
-        with patch("asyncio.run") as mock_run:
-            # Import main function
-            from adapters.push_notification_adapter import main
 
-            # The test just verifies the function exists and can be imported
-            # The actual asyncio.run call is tested implicitly by importing
-            assert callable(main)
+        res = await adapter._send_apns("t", notif, dry_run=True)
+        assert res.success is True
+        fcm_send.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_get_active_tokens_with_filters(self, adapter):
         """Test active tokens retrieval with filters"""
-        now = datetime.now()
-        adapter.device_tokens = {
-            "t1": DeviceToken(
-                "t1", Platform.ANDROID, user_id="u1", is_active=True, last_active=now
-            ),
-            "t2": DeviceToken(
-                "t2", Platform.IOS, user_id="u1", is_active=True, last_active=now
-            ),
-            "t3": DeviceToken(
-                "t3", Platform.ANDROID, user_id="u2", is_active=True, last_active=now
-            ),
-            "t4": DeviceToken(
-                "t4", Platform.ANDROID, user_id="u1", is_active=False, last_active=now
-            ),
-        }
+        adapter.device_tokens = _make_tokens(
+            [
+                ("t1", Platform.ANDROID, "u1", True),
+                ("t2", Platform.IOS, "u1", True),
+                ("t3", Platform.ANDROID, "u2", True),
+                ("t4", Platform.ANDROID, "u1", False),
+            ]
+        )
 
         # Filter by user
         tokens = await adapter.get_active_tokens(user_id="u1")
@@ -833,12 +887,30 @@ class TestPushNotificationAdapterBranches:
         assert len(tokens) == 1
         assert tokens[0].token == "t1"
 
-    @pytest.mark.asyncio
+    async def test_token_indexes_follow_registration(self, adapter):
+        """Test the user/platform indexes track register and unregister"""
+        with patch.object(adapter, "_save_tokens"):
+            await adapter.register_token("t1", Platform.ANDROID, "u1")
+            await adapter.register_token("t2", Platform.IOS, "u1")
+            # Re-registering moves the token to its new owner
+            await adapter.register_token("t1", Platform.ANDROID, "u2")
+            await adapter.unregister_token("t2")
+
+        assert await adapter.get_active_tokens(user_id="u1") == []
+        tokens = await adapter.get_active_tokens(user_id="u2")
+        assert [t.token for t in tokens] == ["t1"]
+        assert await adapter.get_active_tokens(platform=Platform.IOS) == []
+        assert adapter._tokens_by_user == {"u2": {"t1": None}}
+
+        # An in-place delete leaves stale index entries that must be skipped
+        del adapter.device_tokens["t1"]
+        assert await adapter.get_active_tokens(user_id="u2") == []
+        assert await adapter.get_active_tokens(platform=Platform.ANDROID) == []
+
     async def test_cleanup_inactive_tokens_error_handling(self, adapter):
         """Test inactive token cleanup with errors"""
-        old_date = datetime.now() - timedelta(days=40)
         adapter.device_tokens = {
-            "t1": DeviceToken("t1", Platform.ANDROID, "u1", last_active=old_date)
+            "t1": DeviceToken("t1", Platform.ANDROID, "u1", last_active=_OLD)
         }
 
         with patch.object(
@@ -847,28 +919,114 @@ class TestPushNotificationAdapterBranches:
             removed = await adapter.cleanup_inactive_tokens(max_inactive_days=30)
             assert removed == 0  # Should handle error gracefully
 
-    @pytest.mark.asyncio
-    async def test_send_to_user_partial_failures(self, adapter):
+    async def test_send_to_user_partial_failures(self, adapter, notif, user_tokens):
         """Test send to user with partial failures"""
-        adapter.device_tokens = {
-            "t1": DeviceToken("t1", Platform.ANDROID, user_id="u1"),
-            "t2": DeviceToken("t2", Platform.IOS, user_id="u1"),
+        adapter.device_tokens = dict(user_tokens)
+
+        # t1 succeeds, t2 fails; keyed by token since the sends run concurrently
+        results = {
+            "t1": NotificationResult(success=True),
+            "t2": NotificationResult(success=False, error="token invalid"),
         }
-        notif = create_notification("T", "B")
+        started = []
+        both_started = asyncio.Event()
 
-        with patch.object(adapter, "send_to_token", new_callable=AsyncMock) as m:
-            # First call succeeds, second fails
-            m.side_effect = [
-                NotificationResult(success=True),
-                NotificationResult(success=False, error="token invalid"),
-            ]
+        async def send_to_token(*args, token, **kwargs):
+            started.append(token)
+            if len(started) == len(results):
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return results[token]
 
+        with patch.object(adapter, "send_to_token", send_to_token):
             res = await adapter.send_to_user("u1", notif)
             assert res.success is True  # At least one succeeded
             assert "1/2 sent" in (res.error or "")
 
-    @pytest.mark.asyncio
-    async def test_main_function(self):
+    async def test_send_to_user_multicasts_android(
+        self, adapter, notif, ok_send, monkeypatch
+    ):
+        """Test several Android devices share one multicast request"""
+        adapter._firebase_app = FIREBASE_APP
+        adapter.device_tokens = _make_tokens(
+            [
+                ("a1", Platform.ANDROID, "u1", True),
+                ("a2", Platform.ANDROID, "u1", True),
+                ("i1", Platform.IOS, "u1", True),
+            ]
+        )
+        multicast = MagicMock(
+            return_value=SimpleNamespace(
+                responses=[
+                    SimpleNamespace(exception=None, message_id="m1"),
+                    SimpleNamespace(exception=Exception("quota"), message_id=None),
+                ]
+            )
+        )
+        monkeypatch.setattr(
+            "adapters.push_notification_adapter.messaging.send_each_for_multicast",
+            multicast,
+        )
+
+        with patch.object(adapter, "send_to_token", ok_send):
+            res = await adapter.send_to_user("u1", notif)
+
+        assert res.success is True
+        assert res.error == "2/3 sent"
+        multicast.assert_called_once()
+        ok_send.assert_called_once()
+        assert ok_send.call_args.kwargs["token"] == "i1"
+
+    async def test_send_multicast_batches_and_errors(self, adapter, notif, monkeypatch):
+        """Test send_multicast batching, unregistered tokens and batch failures"""
+        adapter._firebase_app = FIREBASE_APP
+        monkeypatch.setattr("adapters.push_notification_adapter.FCM_MULTICAST_LIMIT", 2)
+        multicast = MagicMock(
+            side_effect=[
+                SimpleNamespace(
+                    responses=[
+                        SimpleNamespace(exception=None, message_id="m1"),
+                        SimpleNamespace(exception=Exception("UNREGISTERED")),
+                    ]
+                ),
+                Exception("batch down"),
+            ]
+        )
+        monkeypatch.setattr(
+            "adapters.push_notification_adapter.messaging.send_each_for_multicast",
+            multicast,
+        )
+
+        with patch.object(adapter, "unregister_token", new_callable=AsyncMock) as mu:
+            results = await adapter.send_multicast(["t1", "t2", "t3"], notif)
+
+        assert [r.success for r in results] == [True, False, False]
+        assert results[0].message_id == "m1"
+        assert results[1].error == "Token unregistered"
+        assert results[2].error == "batch down"
+        assert multicast.call_count == 2
+        mu.assert_called_once_with("t2")
+
+    async def test_send_multicast_short_circuits(self, adapter, notif, monkeypatch):
+        """Test send_multicast with no tokens, no Firebase app and dry run"""
+        multicast = MagicMock()
+        monkeypatch.setattr(
+            "adapters.push_notification_adapter.messaging.send_each_for_multicast",
+            multicast,
+        )
+
+        assert await adapter.send_multicast([], notif) == []
+
+        adapter._firebase_app = None
+        results = await adapter.send_multicast(["t1", "t2"], notif)
+        assert [r.error for r in results] == ["FCM not initialized"] * 2
+
+        adapter._firebase_app = FIREBASE_APP
+        results = await adapter.send_multicast(["t1", "t2"], notif, dry_run=True)
+        assert all(r.success for r in results)
+        multicast.assert_not_called()
+
+    async def test_main_function(self, printed):
         """Test the main function example"""
         # Mock the entire main function execution
         with (
@@ -878,22 +1036,18 @@ class TestPushNotificationAdapterBranches:
             patch(
                 "adapters.push_notification_adapter.create_notification"
             ) as mock_create,
-            patch("builtins.print") as mock_print,
         ):
             mock_adapter = AsyncMock()
             mock_adapter_class.return_value = mock_adapter
             mock_adapter.initialize.return_value = True
 
-            mock_notification = MagicMock()
-            mock_create.return_value = mock_notification
-
-            mock_result = MagicMock()
-            mock_result.success = True
-            mock_adapter.send_to_token.return_value = mock_result
+            mock_create.return_value = SimpleNamespace()
+            mock_adapter.send_to_token.return_value = SimpleNamespace(success=True)
 
             # Import and run main
             from adapters.push_notification_adapter import main
 
+            assert inspect.iscoroutinefunction(main)
             await main()
 
             # Verify calls
@@ -901,158 +1055,69 @@ class TestPushNotificationAdapterBranches:
             mock_adapter.initialize.assert_called_once()
             mock_adapter.register_token.assert_called_once()
             mock_adapter.send_to_token.assert_called_once()
-            mock_print.assert_called()
-
-    def test_notification_result_from_firebase_getattr_exception(self):
-        """Test NotificationResult.from_firebase with getattr exception on canonical_address_count"""
-        mock_response = MagicMock()
-        mock_response.exception = None
-        mock_response.message_id = "msg123"
-        # Make canonical_address_count raise an exception
-        mock_response.canonical_address_count = MagicMock(
-            side_effect=Exception("getattr error")
-        )
-
-        result = NotificationResult.from_firebase(mock_response)
-        assert result.success is True
-        assert result.message_id == "msg123"
-        assert result.canonical_token is False
+            assert printed
 
-    @pytest.mark.asyncio
-    async def test_initialize_fcm_credential_loading_exception(self, adapter):
+    async def test_initialize_fcm_credential_loading_exception(
+        self, adapter, fcm_patches
+    ):
         """Test _initialize_fcm with credential loading exception"""
-        adapter.fcm_credential_path = "/valid/path.json"
-        adapter.fcm_project_id = "test-project"
-
-        with patch(
-            "adapters.push_notification_adapter.os.path.exists", return_value=True
-        ):
-            with patch(
-                "adapters.push_notification_adapter.credentials.Certificate",
-                side_effect=Exception("Credential error"),
-            ):
-                with patch(
-                    "adapters.push_notification_adapter.firebase_admin.initialize_app"
-                ) as mock_init:
-                    with patch("builtins.print") as mock_print:
-                        adapter._initialize_fcm()
-                        # Should try to initialize app with None credentials
-                        mock_init.assert_called_once_with(
-                            None, {"projectId": "test-project"}
-                        )
-
-    @pytest.mark.asyncio
-    async def test_initialize_fcm_app_initialization_exception(self, adapter):
-        """Test _initialize_fcm with firebase app initialization exception"""
-        adapter.fcm_credential_path = "/valid/path.json"
-        adapter.fcm_project_id = "test-project"
-
-        with patch(
-            "adapters.push_notification_adapter.os.path.exists", return_value=True
-        ):
-            with patch(
-                "adapters.push_notification_adapter.credentials.Certificate",
-                return_value=MagicMock(),
-            ):
-                with patch(
-                    "adapters.push_notification_adapter.firebase_admin.initialize_app",
-                    side_effect=Exception("App init error"),
-                ):
-                    with patch("builtins.print") as mock_print:
-                        adapter._initialize_fcm()
-                        mock_print.assert_called_with(
-                            "[Push] FCM initialization warning: App init error"
-                        )
+        fcm_patches.cert.side_effect = Exception("Credential error")
 
-    def test_create_default_channels(self, adapter):
-        """Test _create_default_channels creates expected channels"""
-        adapter._create_default_channels()
+        adapter._initialize_fcm()
+        # Should try to initialize app with None credentials
+        fcm_patches.init.assert_called_once_with(None, {"projectId": "test-project"})
 
-        assert "megabot_default" in adapter.notification_channels
-        assert "megabot_alerts" in adapter.notification_channels
-        assert "megabot_messages" in adapter.notification_channels
-        assert "megabot_silent" in adapter.notification_channels
+    async def test_initialize_fcm_app_initialization_exception(
+        self, adapter, fcm_patches, printed
+    ):
+        """Test _initialize_fcm with firebase app initialization exception"""
+        fcm_patches.init.side_effect = Exception("App init error")
 
-        default_channel = adapter.notification_channels["megabot_default"]
-        assert default_channel.name == "MegaBot Messages"
-        assert default_channel.importance == 4
+        adapter._initialize_fcm()
+        assert printed[-1] == "[Push] FCM initialization warning: App init error"
 
-    @pytest.mark.asyncio
     async def test_register_token_general_exception_handling(self, adapter):
         """Test register_token with general exception"""
         with patch.object(
-            adapter, "_save_tokens", side_effect=Exception("Save failed")
+            adapter, "_schedule_save", side_effect=Exception("Save failed")
         ):
             result = await adapter.register_token(
                 "test_token", Platform.ANDROID, "user123"
             )
             assert result is False
 
-    @pytest.mark.asyncio
     async def test_unregister_token_general_exception_handling(self, adapter):
         """Test unregister_token with general exception"""
         adapter.device_tokens = {
             "test_token": DeviceToken("test_token", Platform.ANDROID, "user123")
         }
         with patch.object(
-            adapter, "_save_tokens", side_effect=Exception("Save failed")
+            adapter, "_schedule_save", side_effect=Exception("Save failed")
         ):
             result = await adapter.unregister_token("test_token")
             assert result is False
 
-    @pytest.mark.asyncio
-    async def test_unsubscribe_from_topic_no_firebase_app(self, adapter):
-        """Test unsubscribe_from_topic without Firebase app"""
-        adapter._firebase_app = None
-
-        result = await adapter.unsubscribe_from_topic(["t1"], "news")
-        assert result is False
-
-    @pytest.mark.asyncio
-    async def test_send_webpush_exception_handling(self, adapter):
+    async def test_send_webpush_exception_handling(
+        self, adapter, notif, fcm_send, printed
+    ):
         """Test _send_webpush with internal exceptions"""
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
+        adapter._firebase_app = FIREBASE_APP
+        fcm_send.side_effect = Exception("WebPush failed")
 
-        with patch(
-            "adapters.push_notification_adapter.messaging.send",
-            side_effect=Exception("WebPush failed"),
-        ):
-            with patch("builtins.print") as mock_print:
-                res = await adapter._send_webpush("t", notif)
-                assert res.success is False
-                assert "WebPush failed" in res.error
-                mock_print.assert_called_with(
-                    "[Push] WebPush send failed: WebPush failed"
-                )
-
-    @pytest.mark.asyncio
-    async def test_unsubscribe_from_topic_partial_success(self, adapter):
-        """Test unsubscribe_from_topic with partial success"""
-        adapter._firebase_app = MagicMock()
-        mock_response = MagicMock()
-        mock_response.success_count = 1
-        firebase_messaging_mock.unsubscribe_from_topic.return_value = mock_response
-
-        result = await adapter.unsubscribe_from_topic(
-            ["token1", "token2"], "test_topic"
-        )
-        assert result is False  # success_count != len(tokens)
+        res = await adapter._send_webpush("t", notif)
+        assert res.success is False
+        assert "WebPush failed" in res.error
+        assert printed[-1] == "[Push] WebPush send failed: WebPush failed"
 
-    @pytest.mark.asyncio
-    async def test_get_apns_jwt_encode_exception(self, adapter):
+    async def test_get_apns_jwt_encode_exception(self, adapter, apns_key):
         """Test _get_apns_jwt with JWT encoding exception"""
-        adapter.apns_key_path = "/valid/path.p8"
-        adapter.apns_key_id = "test_key"
-        adapter.apns_team_id = "test_team"
-
-        with patch("builtins.open", mock_open(read_data="key_data")):
-            with patch("jwt.encode", side_effect=Exception("Encode error")):
-                result = await adapter._get_apns_jwt()
-                assert result == ""
+        with patch("jwt.encode", side_effect=Exception("Encode error")):
+            result = await adapter._get_apns_jwt()
+            assert result == ""
 
-    @pytest.mark.asyncio
-    async def test_delete_notification_channel_exception_handling(self, adapter):
+    async def test_delete_notification_channel_exception_handling(
+        self, adapter, printed
+    ):
         """Test delete_notification_channel with exception"""
         # Mock the notification_channels dict to raise exception on deletion
         original_dict = adapter.notification_channels
@@ -1062,49 +1127,36 @@ class TestPushNotificationAdapterBranches:
         adapter.notification_channels = mock_dict
 
         try:
-            with patch("builtins.print") as mock_print:
-                result = await adapter.delete_notification_channel("test")
-                assert result is False
-                mock_print.assert_called_with(
-                    "[Push] Channel deletion failed: Deletion error"
-                )
+            result = await adapter.delete_notification_channel("test")
+            assert result is False
+            assert printed[-1] == "[Push] Channel deletion failed: Deletion error"
         finally:
             # Restore original dict
             adapter.notification_channels = original_dict
 
-    @pytest.mark.asyncio
-    async def test_subscribe_to_topic_success(self, adapter):
-        """Test subscribe_to_topic with successful subscription"""
-        adapter._firebase_app = MagicMock()
-
-        with patch(
-            "adapters.push_notification_adapter.messaging.subscribe_to_topic"
-        ) as mock_subscribe:
-            mock_subscribe.return_value = mock_topic_response
-            result = await adapter.subscribe_to_topic(["t1"], "news")
-            assert result is True  # success_count (1) == len(tokens) (1)
-            mock_subscribe.assert_called_once_with(["t1"], "news")
-
-    @pytest.mark.asyncio
-    async def test_subscribe_to_topic_partial_success(self, adapter):
-        """Test subscribe_to_topic with partial success"""
-        adapter._firebase_app = MagicMock()
+    @pytest.mark.parametrize("method", ["subscribe_to_topic", "unsubscribe_from_topic"])
+    @pytest.mark.parametrize(
+        "tokens,expected",
+        [(["t1"], True), (["t1", "t2"], False)],  # success_count is always 1
+        ids=["all", "partial"],
+    )
+    async def test_topic_subscription(
+        self, adapter, monkeypatch, method, tokens, expected
+    ):
+        """Test topic (un)subscription succeeds only if every token succeeded"""
+        adapter._firebase_app = FIREBASE_APP
+        mock_op = MagicMock(return_value=mock_topic_response)
+        monkeypatch.setattr(
+            f"adapters.push_notification_adapter.messaging.{method}", mock_op
+        )
 
-        with patch(
-            "adapters.push_notification_adapter.messaging.subscribe_to_topic"
-        ) as mock_subscribe:
-            mock_response = MagicMock()
-            mock_response.success_count = 1
-            mock_subscribe.return_value = mock_response
-
-            result = await adapter.subscribe_to_topic(
-                ["token1", "token2"], "test_topic"
-            )
-            assert result is False  # success_count != len(tokens)
-            mock_subscribe.assert_called_once_with(["token1", "token2"], "test_topic")
+        result = await getattr(adapter, method)(tokens, "news")
+        assert result is expected
+        mock_op.assert_called_once_with(tokens, "news")
 
-    @pytest.mark.asyncio
-    async def test_create_notification_channel_exception_handling(self, adapter):
+    async def test_create_notification_channel_exception_handling(
+        self, adapter, printed
+    ):
         """Test create_notification_channel with exception"""
         # Mock the notification_channels dict to raise exception on assignment
         original_dict = adapter.notification_channels
@@ -1114,27 +1166,20 @@ class TestPushNotificationAdapterBranches:
 
         try:
             channel = NotificationChannel(id="c1", name="N")
-            with patch("builtins.print") as mock_print:
-                result = await adapter.create_notification_channel(channel)
-                assert result is False
-                mock_print.assert_called_with(
-                    "[Push] Channel creation failed: Creation error"
-                )
+            result = await adapter.create_notification_channel(channel)
+            assert result is False
+            assert printed[-1] == "[Push] Channel creation failed: Creation error"
         finally:
             # Restore original dict
             adapter.notification_channels = original_dict
 
-    @pytest.mark.asyncio
-    async def test_send_to_user_with_platform_filter(self, adapter):
+    async def test_send_to_user_with_platform_filter(
+        self, adapter, notif, ok_send, user_tokens
+    ):
         """Test send_to_user with platform filtering"""
-        adapter.device_tokens = {
-            "t1": DeviceToken("t1", Platform.ANDROID, user_id="u1"),
-            "t2": DeviceToken("t2", Platform.IOS, user_id="u1"),
-        }
-        notif = create_notification("T", "B")
+        adapter.device_tokens = dict(user_tokens)
 
-        with patch.object(adapter, "send_to_token", new_callable=AsyncMock) as m:
-            m.return_value = NotificationResult(success=True)
+        with patch.object(adapter, "send_to_token", ok_send) as m:
             res = await adapter.send_to_user("u1", notif, platform=Platform.ANDROID)
             assert res.success is True
             assert m.call_count == 1  # Only Android token should be sent to
@@ -1143,71 +1188,55 @@ class TestPushNotificationAdapterBranches:
             call_kwargs = m.call_args[1]  # Get keyword arguments
             assert call_kwargs["token"] == "t1"  # Token should be t1
 
-    @pytest.mark.asyncio
-    async def test_main_function_execution(self):
-        """Test that main function can be executed without error"""
-        # Test that the main function exists and is callable
-        from adapters.push_notification_adapter import main
-
-        assert callable(main)
-
-        # Mock the adapter initialization to avoid actual Firebase/APNS setup
-        with patch(
-            "adapters.push_notification_adapter.PushNotificationAdapter"
-        ) as mock_adapter_class:
-            mock_adapter = MagicMock()
-            mock_adapter.initialize.return_value = True
-            mock_adapter_class.return_value = mock_adapter
-
-            # The main function should be awaitable (async)
-            import asyncio
-
-            assert asyncio.iscoroutinefunction(main)
-
-    @pytest.mark.asyncio
-    async def test_send_broadcast_no_active_tokens(self, adapter):
+    async def test_send_broadcast_no_active_tokens(self, adapter, notif):
         """Test send_broadcast when no active tokens are registered"""
-        adapter._firebase_app = MagicMock()
+        adapter._firebase_app = FIREBASE_APP
         adapter.device_tokens = {}
-        notif = create_notification("T", "B")
 
         result = await adapter.send_broadcast(notif)
         assert result.success is False
         assert result.error == "No active tokens registered"
 
-    @pytest.mark.asyncio
-    async def test_send_webpush_full_coverage(self, adapter):
+    async def test_send_webpush_full_coverage(self, adapter, notif, fcm_send):
         """Test _send_webpush with dry_run and success paths"""
-        adapter._firebase_app = MagicMock()
-        notif = create_notification("T", "B")
+        adapter._firebase_app = FIREBASE_APP
+        fcm_send.return_value = "web_msg_id"
 
-        with patch("adapters.push_notification_adapter.messaging.send") as mock_send:
-            mock_send.return_value = "web_msg_id"
-
-            # Test dry_run (line 1029)
-            result = await adapter._send_webpush("t", notif, dry_run=True)
-            assert result.success is True
-            mock_send.assert_not_called()
+        # Test dry_run (line 1029)
+        result = await adapter._send_webpush("t", notif, dry_run=True)
+        assert result.success is True
+        fcm_send.assert_not_called()
 
-            # Test success (line 1032)
-            result = await adapter._send_webpush("t", notif, dry_run=False)
-            assert result.success is True
-            assert result.message_id == "web_msg_id"
-            mock_send.assert_called_once()
+        # Test success (line 1032)
+        result = await adapter._send_webpush("t", notif, dry_run=False)
+        assert result.success is True
+        assert result.message_id == "web_msg_id"
+        fcm_send.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_get_apns_jwt_success(self, adapter):
+    async def test_get_apns_jwt_success(self, adapter, apns_key):
         """Test _get_apns_jwt success path (line 1066)"""
-        adapter.apns_key_path = "/tmp/key.p8"
-        adapter.apns_key_id = "keyid"
-        adapter.apns_team_id = "teamid"
+        with patch("jwt.encode", return_value="mock_jwt_token") as mock_encode:
+            token = await adapter._get_apns_jwt()
+            assert token == "mock_jwt_token"
+            assert mock_encode.call_args.args[1] == "key_data"
+
+    async def test_apns_jwt_cache_hit(self, adapter, apns_key, monkeypatch):
+        """Test the signed JWT is reused until APNS_JWT_TTL elapses"""
+        opened = []
+        monkeypatch.setattr(
+            "adapters.push_notification_adapter.aiofiles.open",
+            lambda *args, **kwargs: opened.append(args) or FakeAioFile("key_data"),
+        )
+        with patch("jwt.encode", side_effect=["jwt1", "jwt2"]):
+            assert await adapter._get_apns_jwt() == "jwt1"
+            assert await adapter._get_apns_jwt() == "jwt1"
+            assert len(opened) == 1
 
-        with patch("builtins.open", mock_open(read_data="key_data")):
-            with patch("jwt.encode", return_value="mock_jwt_token"):
-                token = await adapter._get_apns_jwt()
-                assert token == "mock_jwt_token"
+            token, issued_at = adapter._apns_jwt_cache
+            adapter._apns_jwt_cache = (token, issued_at - APNS_JWT_TTL)
+            assert await adapter._get_apns_jwt() == "jwt2"
+            assert len(opened) == 2
 
-    @pytest.mark.asyncio
     async def test_channel_management_success(self, adapter):
         """Test channel creation and deletion success (lines 1082, 1100)"""
         channel = NotificationChannel(id="new_channel", name="New")
@@ -1220,12 +1249,30 @@ class TestPushNotificationAdapterBranches:
         assert await adapter.delete_notification_channel("new_channel") is True
         assert "new_channel" not in adapter.notification_channels
 
-    @pytest.mark.asyncio
+        # Deleting a default hides it in this adapter only
+        adapter._create_default_channels()
+        other = copy.copy(adapter.notification_channels)
+        assert await adapter.delete_notification_channel("megabot_default") is True
+        channels = adapter.notification_channels
+        assert "megabot_default" not in channels
+        assert "megabot_default" not in list(channels)
+        assert channels.get("megabot_default") is None
+        assert len(channels) == len(_DEFAULT_CHANNELS) - 1
+        assert "megabot_default" in other
+        assert "megabot_default" in _DEFAULT_CHANNELS
+
+        # Re-creating it, or initializing again, makes a channel visible again
+        replacement = NotificationChannel(id="megabot_default", name="Mine")
+        assert await adapter.create_notification_channel(replacement) is True
+        assert channels["megabot_default"] is replacement
+        del channels["megabot_default"]
+        adapter._create_default_channels()
+        assert channels["megabot_default"] is _DEFAULT_CHANNELS["megabot_default"]
+
     async def test_cleanup_inactive_tokens_success(self, adapter):
         """Test cleanup_inactive_tokens success path (lines 1146-1148)"""
-        old_date = datetime.now() - timedelta(days=40)
         adapter.device_tokens = {
-            "t1": DeviceToken("t1", Platform.ANDROID, "u1", last_active=old_date)
+            "t1": DeviceToken("t1", Platform.ANDROID, "u1", last_active=_OLD)
         }
 
         with patch.object(
@@ -1235,3 +1282,23 @@ class TestPushNotificationAdapterBranches:
             removed = await adapter.cleanup_inactive_tokens(max_inactive_days=30)
             assert removed == 1
             mock_unreg.assert_called_once_with("t1")
+
+
+def test_real_firebase_messaging_has_multicast_api():
+    """The multicast call the adapter makes exists on the real firebase_admin"""
+    # conftest swaps firebase_admin for MagicMocks; import the real one aside
+    saved = dict(sys.modules)
+    for name in list(sys.modules):
+        if name == "firebase_admin" or name.startswith("firebase_admin."):
+            del sys.modules[name]
+    try:
+        real = pytest.importorskip("firebase_admin.messaging")
+        assert callable(getattr(real, "send_each_for_multicast", None))
+        assert callable(real.send)
+        assert callable(real.subscribe_to_topic)
+        assert callable(real.unsubscribe_from_topic)
+    finally:
+        for name in list(sys.modules):
+            if name not in saved:
+                del sys.modules[name]
+        sys.modules.update(saved)
@@ -2,10 +2,13 @@
 Tests for Signal Adapter
 """
 
+import copy
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
-import json
+import orjson
 import asyncio
+from dataclasses import replace
+from types import SimpleNamespace
 
 from adapters.messaging import MessageType
 from adapters.signal_adapter import (
@@ -20,6 +23,182 @@ from adapters.signal_adapter import (
     SignalReaction,
 )
 
+# Canned _send_json_rpc results for initialize(); other methods just succeed
+_INIT_RPC_RESPONSES = {
+    "listGroups": [{"id": "g1", "name": "Group 1"}],
+    "listContacts": [{"number": "+123"}],
+}
+
+
+def _init_rpc_side_effect(method, params):
+    return _INIT_RPC_RESPONSES.get(method, True)
+
+
+# Minimal data-message envelope; tests only read it, never mutate it
+_DATA_ENVELOPE = {"envelopeId": "1", "dataMessage": {"message": "test"}}
+
+# Pre-encoded signal-cli output lines shared by the RPC and reader tests
+_RPC_OK = orjson.dumps({"result": "ok"}) + b"\n"
+_READ_LINE_OK = orjson.dumps(_DATA_ENVELOPE) + b"\n"
+
+# Non-data envelopes keyed by their signal-cli "type"
+_TYPED_ENVELOPES = {
+    kind: {
+        "envelopeId": f"{kind}_123",
+        "source": "+1234567890",
+        "timestamp": 1234567890,
+        "type": kind,
+    }
+    for kind in ("read", "delivered", "sessionReset", "typing")
+}
+
+# signal-cli JSON exercising every optional field, parsed fresh by each test
+_FULL_MSG_BYTES = orjson.dumps(
+    {
+        "envelopeId": "test_id",
+        "source": "+1234567890",
+        "timestamp": 1234567890,
+        "type": "dataMessage",
+        "dataMessage": {
+            "message": "Hello world",
+            "attachments": [
+                {
+                    "id": "att1",
+                    "contentType": "image/jpeg",
+                    "filename": "test.jpg",
+                    "size": 1024,
+                    "url": "http://example.com/att1",
+                    "thumbnail": "http://example.com/thumb1",
+                }
+            ],
+            "groupInfo": {"id": "group123", "name": "Test Group", "type": "MASTER"},
+            "quote": {
+                "id": 123,
+                "author": "+0987654321",
+                "text": "Quoted message",
+                "attachments": [{"id": "quote_att", "contentType": "text/plain"}],
+            },
+            "reaction": {
+                "emoji": "👍",
+                "targetAuthor": "+0987654321",
+                "targetTimestamp": 1234567800,
+            },
+        },
+        "isUnidentified": True,
+    }
+)
+
+_FULL_GROUP_BYTES = orjson.dumps(
+    {
+        "id": "group123",
+        "name": "Test Group",
+        "description": "A test group",
+        "members": ["+123", "+456"],
+        "admins": ["+123"],
+        "type": "MASTER",
+        "avatar": "http://example.com/avatar.jpg",
+        "createdAt": 1234567890,
+        "isArchived": True,
+    }
+)
+
+# Platform message type expected for a single attachment of each content type
+_EXPECTED = {
+    "image/png": MessageType.IMAGE,
+    "image/jpeg": MessageType.IMAGE,
+    "video/mp4": MessageType.VIDEO,
+    "audio/mpeg": MessageType.AUDIO,
+    "audio/ogg": MessageType.AUDIO,
+    "application/pdf": MessageType.DOCUMENT,
+}
+
+# Read-only attachments shared by the conversion tests, keyed by content type
+_ATT = {ct: SignalAttachment(content_type=ct) for ct in _EXPECTED}
+
+# Template message; tests derive variants with dataclasses.replace()
+_BASE_MSG = SignalMessage(id="1", source="s", timestamp=1)
+
+
+async def _noop(*args, **kwargs):
+    """Awaitable stand-in for calls whose arguments no test inspects"""
+
+
+def _raising(message):
+    """An async callable that always raises RuntimeError(message)"""
+
+    async def _raise(*args, **kwargs):
+        raise RuntimeError(message)
+
+    return _raise
+
+
+async def _daemon_failed():
+    """communicate() result for a signal-cli daemon that exited with an error"""
+    return b"", b"error"
+
+
+class _Counter:
+    """Async handler that only counts its calls"""
+
+    def __init__(self):
+        self.n = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.n += 1
+
+
+class _StubStdin:
+    """signal-cli stdin stand-in: sync write() that records, async drain()"""
+
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def drain(self):
+        pass
+
+
+def _stream_reader(*lines):
+    """A real asyncio.StreamReader pre-fed with lines, then EOF"""
+    reader = asyncio.StreamReader()
+    for line in lines:
+        reader.feed_data(line)
+    reader.feed_eof()
+    return reader
+
+
+# AsyncMocks are reused across tests instead of being rebuilt for every test
+_POOL = []
+
+
+def _take_mock():
+    return _POOL.pop() if _POOL else AsyncMock()
+
+
+def _return_mock(mock):
+    mock.reset_mock(return_value=True, side_effect=True)
+    _POOL.append(mock)
+
+
+@pytest.fixture
+def pooled_async_mock():
+    """A reset AsyncMock from the module pool, handed back after the test"""
+    mock = _take_mock()
+    yield mock
+    _return_mock(mock)
+
+
+async def _no_sleep(delay, result=None):
+    return result
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """Make asyncio.sleep return immediately (daemon startup, RPC read waits)"""
+    monkeypatch.setattr(asyncio, "sleep", _no_sleep)
+
 
 class TestSignalDataClasses:
     """Test Signal data classes"""
@@ -31,98 +210,55 @@ class TestSignalDataClasses:
         assert r.username == "un"
 
     def test_signal_attachment(self):
-        a = SignalAttachment.from_dict(
-            {
-                "id": "1",
-                "contentType": "t",
-                "filename": "f",
-                "size": 10,
-                "url": "u",
-                "thumbnail": "th",
-            }
-        )
+        a = SignalAttachment(id="1", content_type="t")
         assert a.id == "1"
         assert a.content_type == "t"
+        assert a.filename is None and a.size is None
 
     def test_signal_quote(self):
-        q = SignalQuote.from_dict(
-            {"id": 1, "author": "a", "text": "t", "attachments": [{"id": "1"}]}
-        )
+        q = SignalQuote(id=1, author="a", attachments=[SignalAttachment(id="1")])
         assert q.id == 1
         assert len(q.attachments) == 1
+        assert SignalQuote(id=2, author="b").attachments == []
 
     def test_signal_reaction(self):
-        r = SignalReaction.from_dict(
-            {"emoji": "e", "targetAuthor": "a", "targetTimestamp": 1}
-        )
+        r = SignalReaction(emoji="e", target_author="a", target_timestamp=1)
         assert r.emoji == "e"
 
     def test_signal_message_full_data(self):
         """Test SignalMessage.from_dict with all optional fields"""
-        full_data = {
-            "envelopeId": "test_id",
-            "source": "+1234567890",
-            "timestamp": 1234567890,
-            "type": "dataMessage",
-            "dataMessage": {
-                "message": "Hello world",
-                "attachments": [
-                    {
-                        "id": "att1",
-                        "contentType": "image/jpeg",
-                        "filename": "test.jpg",
-                        "size": 1024,
-                        "url": "http://example.com/att1",
-                        "thumbnail": "http://example.com/thumb1",
-                    }
-                ],
-                "groupInfo": {"id": "group123", "name": "Test Group", "type": "MASTER"},
-                "quote": {
-                    "id": 123,
-                    "author": "+0987654321",
-                    "text": "Quoted message",
-                    "attachments": [{"id": "quote_att", "contentType": "text/plain"}],
-                },
-                "reaction": {
-                    "emoji": "👍",
-                    "targetAuthor": "+0987654321",
-                    "targetTimestamp": 1234567800,
-                },
-            },
-            "isUnidentified": True,
-        }
-
-        msg = SignalMessage.from_dict(full_data)
+        msg = SignalMessage.from_dict(orjson.loads(_FULL_MSG_BYTES))
         assert msg.id == "test_id"
         assert msg.source == "+1234567890"
         assert msg.timestamp == 1234567890
         assert msg.message_type == SignalMessageType.DATA_MESSAGE
         assert msg.content == "Hello world"
-        assert len(msg.attachments) == 1
-        assert msg.attachments[0].content_type == "image/jpeg"
+        assert msg.attachments == [
+            SignalAttachment(
+                id="att1",
+                content_type="image/jpeg",
+                filename="test.jpg",
+                size=1024,
+                url="http://example.com/att1",
+                thumbnail="http://example.com/thumb1",
+            )
+        ]
         assert msg.group_info is not None
-        assert msg.quote is not None
-        assert msg.quote.text == "Quoted message"
-        assert msg.reaction is not None
-        assert msg.reaction.emoji == "👍"
+        assert msg.quote == SignalQuote(
+            id=123,
+            author="+0987654321",
+            text="Quoted message",
+            attachments=[SignalAttachment(id="quote_att", content_type="text/plain")],
+        )
+        assert msg.reaction == SignalReaction(
+            emoji="👍", target_author="+0987654321", target_timestamp=1234567800
+        )
         assert msg.is_receipt is False
         assert msg.is_unidentified is True
 
     def test_signal_group_full_data(self):
         """Test SignalGroup.from_dict with all fields"""
-        full_data = {
-            "id": "group123",
-            "name": "Test Group",
-            "description": "A test group",
-            "members": ["+123", "+456"],
-            "admins": ["+123"],
-            "type": "MASTER",
-            "avatar": "http://example.com/avatar.jpg",
-            "createdAt": 1234567890,
-            "isArchived": True,
-        }
-
-        group = SignalGroup.from_dict(full_data)
+        group = SignalGroup.from_dict(orjson.loads(_FULL_GROUP_BYTES))
         assert group.id == "group123"
         assert group.name == "Test Group"
         assert group.description == "A test group"
@@ -137,61 +273,73 @@ class TestSignalDataClasses:
 class TestSignalAdapter:
     """Test Signal adapter functionality"""
 
-    @pytest.fixture
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+    # Webhook payloads without a dataMessage; handle_webhook ignores them
+    _NO_DATA_WEBHOOKS = (
+        {"envelopeId": "test"},
+        {"envelopeId": "test", "typing": {}},
+        {"envelopeId": "test", "type": "read"},
+    )
+
+    @pytest.fixture(scope="module")
     def adapter(self):
+        """One adapter per module; _reset_adapter restores it between tests"""
         return SignalAdapter(phone_number="+123", socket_path="/tmp/test.sock")
 
-    @pytest.mark.asyncio
-    async def test_initialize_socket(self, adapter):
-        with (
-            patch.object(
-                adapter, "_start_daemon", new_callable=AsyncMock
-            ) as mock_daemon,
-            patch.object(adapter, "_send_json_rpc", new_callable=AsyncMock) as mock_rpc,
-        ):
-            # Mock successful RPC calls for load operations
-            mock_rpc.side_effect = lambda method, params: {
-                "listGroups": [{"id": "g1", "name": "Group 1"}],
-                "listContacts": [{"number": "+123"}],
-            }.get(method, True)
+    @pytest.fixture(autouse=True)
+    def _reset_adapter(self, adapter):
+        """Snapshot the shared adapter's state and put it back after the test"""
+        state = {name: copy.copy(value) for name, value in vars(adapter).items()}
+        yield
+        vars(adapter).clear()
+        vars(adapter).update(state)
+
+    @pytest.fixture
+    def mock_rpc(self, adapter):
+        """Pooled AsyncMock set on adapter._send_json_rpc; undone by the reset"""
+        adapter._send_json_rpc = mock = _take_mock()
+        yield mock
+        _return_mock(mock)
 
-            assert await adapter.initialize() is True
-            assert adapter.is_initialized is True
+    @pytest.fixture
+    def mock_handle(self, adapter):
+        """Pooled AsyncMock set on adapter._handle_message; undone by the reset"""
+        adapter._handle_message = mock = _take_mock()
+        yield mock
+        _return_mock(mock)
 
-            # Verify RPC calls were made
-            assert mock_rpc.call_count >= 2  # At least listGroups and listContacts
+    async def test_initialize_socket(self, adapter, mock_rpc):
+        adapter._start_daemon = mock_daemon = AsyncMock()
+        # Mock successful RPC calls for load operations
+        mock_rpc.side_effect = _init_rpc_side_effect
 
-            # Test fail
-            mock_daemon.side_effect = Exception("error")
-            adapter.is_initialized = False
-            assert await adapter.initialize() is False
+        assert await adapter.initialize() is True
+        assert adapter.is_initialized is True
 
-    @pytest.mark.asyncio
-    async def test_initialize_stdout(self, adapter):
+        # Verify RPC calls were made
+        assert mock_rpc.call_count >= 2  # At least listGroups and listContacts
+
+        # Test fail
+        mock_daemon.side_effect = Exception("error")
+        adapter.is_initialized = False
+        assert await adapter.initialize() is False
+
+    async def test_initialize_stdout(self, adapter, mock_rpc):
         adapter.receive_mode = "stdout"
-        with (
-            patch.object(
-                adapter, "_start_receive_process", new_callable=AsyncMock
-            ) as mock_recv,
-            patch.object(adapter, "_send_json_rpc", new_callable=AsyncMock) as mock_rpc,
-        ):
-            # Mock successful RPC calls
-            mock_rpc.side_effect = lambda method, params: {
-                "listGroups": [{"id": "g1", "name": "Group 1"}],
-                "listContacts": [{"number": "+123"}],
-            }.get(method, True)
+        adapter._start_receive_process = mock_recv = AsyncMock()
+        # Mock successful RPC calls
+        mock_rpc.side_effect = _init_rpc_side_effect
 
-            assert await adapter.initialize() is True
+        assert await adapter.initialize() is True
+        mock_recv.assert_awaited_once()
 
-    @pytest.mark.asyncio
     async def test_shutdown(self, adapter):
-        adapter.process = MagicMock()
-        adapter.process.terminate = MagicMock()
-        adapter.process.wait = AsyncMock()
+        adapter.process = SimpleNamespace(terminate=MagicMock(), wait=_noop)
 
         async def mock_task():
             try:
-                await asyncio.sleep(1)
+                await asyncio.Event().wait()  # parked until shutdown() cancels it
             except asyncio.CancelledError:
                 pass
 
@@ -202,9 +350,10 @@ class TestSignalAdapter:
         assert adapter.reader_task is None
 
         # Test with exceptions
-        adapter.process = MagicMock()
-        adapter.process.terminate = MagicMock(side_effect=Exception("terminate failed"))
-        adapter.process.wait = AsyncMock()
+        adapter.process = SimpleNamespace(
+            terminate=MagicMock(side_effect=Exception("terminate failed")),
+            wait=_noop,
+        )
         adapter.reader_task = asyncio.create_task(mock_task())
 
         # Should not raise exception despite failures
@@ -212,33 +361,28 @@ class TestSignalAdapter:
         assert adapter.process is None
         assert adapter.reader_task is None
 
-    @pytest.mark.asyncio
     async def test_handle_message_types(self, adapter):
-        msg_handler = AsyncMock()
+        msg_handler = _Counter()
+        ty_handler = _Counter()
+        re_handler = _Counter()
         adapter.register_message_handler(msg_handler)
-
-        # Data message
-        await adapter._handle_message(
-            {
-                "envelopeId": "1",
-                "source": "s",
-                "timestamp": 1,
-                "dataMessage": {"message": "m"},
-            }
-        )
-        msg_handler.assert_called_once()
-
-        # Typing
-        ty_handler = AsyncMock()
         adapter.register_reaction_handler(ty_handler)
-        await adapter._handle_message({"typing": {}})
-        ty_handler.assert_called_once()
-
-        # Receipt
-        re_handler = AsyncMock()
         adapter.register_receipt_handler(re_handler)
-        await adapter._handle_message({"type": "read"})
-        re_handler.assert_called_once()
+
+        # Data message, typing and receipt dispatch independently
+        await asyncio.gather(
+            adapter._handle_message(
+                {
+                    "envelopeId": "1",
+                    "source": "s",
+                    "timestamp": 1,
+                    "dataMessage": {"message": "m"},
+                }
+            ),
+            adapter._handle_message({"typing": {}}),
+            adapter._handle_message({"type": "read"}),
+        )
+        assert (msg_handler.n, ty_handler.n, re_handler.n) == (1, 1, 1)
 
         # Error case
         with patch(
@@ -249,300 +393,184 @@ class TestSignalAdapter:
                 {"dataMessage": {}}
             )  # Should log error and not crash
 
-    @pytest.mark.asyncio
-    async def test_to_platform_message(self, adapter):
-        # Image
-        m = SignalMessage(
-            id="1",
-            source="s",
-            timestamp=1,
-            attachments=[SignalAttachment(content_type="image/png")],
-        )
-        pm = await adapter._to_platform_message(m)
-        assert pm.message_type == MessageType.IMAGE
-
-        # Video
-        m.attachments = [SignalAttachment(content_type="video/mp4")]
+    @pytest.mark.parametrize(
+        "content_types,expected",
+        [([ct], expected) for ct, expected in _EXPECTED.items()]
+        + [(["image/png", "video/mp4"], MessageType.IMAGE)],  # first one wins
+        ids=[*_EXPECTED, "image/png+video/mp4"],
+    )
+    async def test_to_platform_message(self, adapter, content_types, expected):
+        """Test the message type follows the first attachment's content type"""
+        m = replace(_BASE_MSG, attachments=[_ATT[ct] for ct in content_types])
         pm = await adapter._to_platform_message(m)
-        assert pm.message_type == MessageType.VIDEO
+        assert pm.message_type is expected
 
-        # Audio
-        m.attachments = [SignalAttachment(content_type="audio/mpeg")]
-        pm = await adapter._to_platform_message(m)
-        assert pm.message_type == MessageType.AUDIO
-
-        # Document
-        m.attachments = [SignalAttachment(content_type="application/pdf")]
-        pm = await adapter._to_platform_message(m)
-        assert pm.message_type == MessageType.DOCUMENT
-
-        # Group
-        m = SignalMessage(id="2", source="s", timestamp=1, group_info={"id": "gid"})
-        pm = await adapter._to_platform_message(m)
-        assert pm.chat_id == "group_gid"
-
-    @pytest.mark.asyncio
     async def test_send_socket_rpc(self, adapter):
-        mock_reader = AsyncMock()
-        mock_writer = MagicMock()
-        mock_writer.write = MagicMock()
-        mock_writer.drain = AsyncMock()
-        mock_writer.close = MagicMock()
-        mock_writer.wait_closed = AsyncMock()
-
-        mock_reader.readline.return_value = (
-            json.dumps({"result": "ok"}).encode() + b"\n"
+        mock_writer = SimpleNamespace(
+            write=MagicMock(),
+            drain=_noop,
+            close=MagicMock(),
+            wait_closed=_noop,
         )
 
-        with patch(
-            "asyncio.open_unix_connection", return_value=(mock_reader, mock_writer)
-        ):
-            res = await adapter._send_socket_rpc("m", {})
-            assert res == "ok"
-
-        # Error case
-        with patch("asyncio.open_unix_connection", side_effect=Exception("error")):
+        # Successive connections: a reply, a connect error, an empty reply
+        with patch("asyncio.open_unix_connection") as mock_connect:
+            mock_connect.side_effect = iter(
+                (
+                    (_stream_reader(_RPC_OK), mock_writer),
+                    Exception("error"),
+                    (_stream_reader(), mock_writer),
+                )
+            )
+            assert await adapter._send_socket_rpc("m", {}) == "ok"
             assert await adapter._send_socket_rpc("m", {}) is None
+            assert await adapter._send_socket_rpc("m", {}) is None
+            mock_connect.assert_called_with(adapter.socket_path)
 
-        # Empty response case
-        mock_reader.readline.return_value = b""
-        with patch(
-            "asyncio.open_unix_connection", return_value=(mock_reader, mock_writer)
-        ):
-            res = await adapter._send_socket_rpc("m", {})
-            assert res is None
-
-    @pytest.mark.asyncio
     async def test_send_stdout_rpc(self, adapter):
         adapter.receive_mode = "stdout"
-        adapter.process = MagicMock()
+        stdin = _StubStdin()
+        adapter.process = SimpleNamespace(stdin=stdin, stdout=_stream_reader(_RPC_OK))
 
-        # Create a mock stdin that supports both sync write and async drain
-        mock_stdin = MagicMock()
-        mock_stdin.write = MagicMock(return_value=None)
-        mock_stdin.drain = AsyncMock()
-        adapter.process.stdin = mock_stdin
+        res = await adapter._send_stdout_rpc("m", {})
+        assert res == "ok"
+        assert orjson.loads(stdin.written[0])["method"] == "m"
 
-        adapter.process.stdout = AsyncMock()
+    async def test_send_message_full(self, adapter, mock_rpc):
+        mock_rpc.return_value = {"envelopeId": "e"}
 
-        adapter.process.stdout.readline.return_value = (
-            json.dumps({"result": "ok"}).encode() + b"\n"
+        # With all params
+        res = await adapter.send_message(
+            "r", "m", quote_message_id="q_123", mentions=["m"], attachments=["a"]
         )
+        assert res == "e"
+        assert mock_rpc.call_count == 1
 
-        res = await adapter._send_stdout_rpc("m", {})
-        assert res == "ok"
+        # Fail case
+        mock_rpc.return_value = None
+        assert await adapter.send_message("r", "m") is None
 
-    @pytest.mark.asyncio
-    async def test_send_message_full(self, adapter):
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = {"envelopeId": "e"}
+        # Exception case
+        mock_rpc.side_effect = Exception("error")
+        assert await adapter.send_message("r", "m") is None
 
-            # With all params
-            res = await adapter.send_message(
-                "r", "m", quote_message_id="q_123", mentions=["m"], attachments=["a"]
-            )
-            assert res == "e"
-            assert mock_rpc.call_count == 1
-
-            # Fail case
-            mock_rpc.return_value = None
-            assert await adapter.send_message("r", "m") is None
-
-            # Exception case
-            mock_rpc.side_effect = Exception("error")
-            assert await adapter.send_message("r", "m") is None
-
-    @pytest.mark.asyncio
-    async def test_group_methods(self, adapter):
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = {"id": "gid"}
-
-            # Create
-            g = await adapter.create_group("n", ["m"], description="d", avatar_path="a")
-            assert g.id == "gid"
-
-            # Update
-            mock_rpc.return_value = True
-            assert (
-                await adapter.update_group("gid", name="new", members_to_add=["m2"])
-                is True
-            )
+    async def test_group_methods(self, adapter, mock_rpc):
+        mock_rpc.return_value = {"id": "gid"}
 
-            # Leave
-            assert await adapter.leave_group("gid") is True
-
-            # Get list
-            mock_rpc.return_value = [{"id": "g1", "name": "N"}]
-            adapter.groups = {}  # Clear cache
-            groups = await adapter.get_groups()
-            assert len(groups) == 1
-
-            # Get single
-            mock_rpc.return_value = {"id": "g1", "name": "N"}
-            g = await adapter.get_group("g1")
-            assert g.id == "g1"
-
-    @pytest.mark.asyncio
-    async def test_send_reaction(self, adapter):
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            result = await adapter.send_reaction(
-                "recipient", "👍", "author", 1234567890
-            )
-            assert result is True
-            mock_rpc.assert_called_once_with(
-                "react",
-                {
-                    "recipient": "recipient",
-                    "emoji": "👍",
-                    "targetAuthor": "author",
-                    "targetTimestamp": 1234567890,
-                },
-            )
+        # Create
+        g = await adapter.create_group("n", ["m"], description="d", avatar_path="a")
+        assert g.id == "gid"
 
-            # Test failure
-            mock_rpc.return_value = None
-            assert (
-                await adapter.send_reaction("recipient", "👍", "author", 1234567890)
-                is False
-            )
+        # Update
+        mock_rpc.return_value = True
+        assert (
+            await adapter.update_group("gid", name="new", members_to_add=["m2"])
+            is True
+        )
 
-            # Test exception
-            mock_rpc.side_effect = Exception("error")
-            assert (
-                await adapter.send_reaction("recipient", "👍", "author", 1234567890)
-                is False
-            )
-            # Should filter out invalid IDs and send valid ones
+        # Leave
+        assert await adapter.leave_group("gid") is True
 
-    @pytest.mark.asyncio
-    async def test_create_group_cache_update(self, adapter):
-        """Test group creation and cache update"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = {"id": "new_group_id", "name": "Test Group"}
+        # Get list
+        mock_rpc.return_value = [{"id": "g1", "name": "N"}]
+        adapter.groups = {}  # Clear cache
+        groups = await adapter.get_groups()
+        assert len(groups) == 1
 
-            group = await adapter.create_group("Test Group", ["+123"])
-            assert group.id == "new_group_id"
-            assert "new_group_id" in adapter.groups
+        # Get single
+        mock_rpc.return_value = {"id": "g1", "name": "N"}
+        g = await adapter.get_group("g1")
+        assert g.id == "g1"
 
-    @pytest.mark.asyncio
-    async def test_load_groups_cache_update(self, adapter):
-        """Test loading groups and cache population"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = [
-                {"id": "g1", "name": "Group 1"},
-                {"id": "g2", "name": "Group 2"},
-            ]
-
-            await adapter._load_groups()
-            assert len(adapter.groups) == 2
-            assert "g1" in adapter.groups
-            assert "g2" in adapter.groups
-
-    @pytest.mark.asyncio
-    async def test_load_contacts_duplicate_handling(self, adapter):
-        """Test loading contacts with duplicates"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = [
-                {"number": "+123"},
-                {"number": "+456"},
-                {"number": "+123"},  # Duplicate
-            ]
-
-            await adapter._load_contacts()
-            # Should deduplicate automatically in list
-            assert "+123" in adapter.registered_numbers
-            assert "+456" in adapter.registered_numbers
-
-    @pytest.mark.asyncio
-    async def test_block_unblock_cache_management(self, adapter):
-        """Test blocking/unblocking and cache updates"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            # Test blocking
-            result = await adapter.block_contact("+123")
-            assert result is True
-            assert "+123" in adapter.blocked_numbers
-
-            # Test unblocking
-            result = await adapter.unblock_contact("+123")
-            assert result is True
-            assert "+123" not in adapter.blocked_numbers
-
-    @pytest.mark.asyncio
-    async def test_handle_webhook_missing_envelope_fields(self, adapter):
-        """Test webhook handling with missing fields"""
-        # Test missing envelopeId
-        result = await adapter.handle_webhook({"dataMessage": {"message": "test"}})
-        assert result is not None  # Should generate UUID
+    async def test_send_reaction(self, adapter, mock_rpc):
+        mock_rpc.return_value = True
 
-        # Test missing dataMessage
-        result = await adapter.handle_webhook({"envelopeId": "test"})
-        assert result is None
+        result = await adapter.send_reaction(
+            "recipient", "👍", "author", 1234567890
+        )
+        assert result is True
+        mock_rpc.assert_called_once_with(
+            "react",
+            {
+                "recipient": "recipient",
+                "emoji": "👍",
+                "targetAuthor": "author",
+                "targetTimestamp": 1234567890,
+            },
+        )
 
-        # Test with non-dataMessage
-        result = await adapter.handle_webhook({"envelopeId": "test", "typing": {}})
-        assert result is None
+        # Test failure
+        mock_rpc.return_value = None
+        assert (
+            await adapter.send_reaction("recipient", "👍", "author", 1234567890)
+            is False
+        )
 
-    @pytest.mark.asyncio
-    async def test_to_platform_message_attachment_types(self, adapter):
-        """Test platform message conversion for different attachment types"""
-        # Test image attachment
-        msg = SignalMessage(
-            id="1",
-            source="+123",
-            timestamp=1234567890,
-            attachments=[SignalAttachment(content_type="image/jpeg")],
+        # Test exception
+        mock_rpc.side_effect = Exception("error")
+        assert (
+            await adapter.send_reaction("recipient", "👍", "author", 1234567890)
+            is False
         )
-        pm = await adapter._to_platform_message(msg)
-        assert pm.message_type == MessageType.IMAGE
+        # Should filter out invalid IDs and send valid ones
 
-        # Test video attachment
-        msg.attachments = [SignalAttachment(content_type="video/mp4")]
-        pm = await adapter._to_platform_message(msg)
-        assert pm.message_type == MessageType.VIDEO
+    async def test_create_group_cache_update(self, adapter, mock_rpc):
+        """Test group creation and cache update"""
+        mock_rpc.return_value = {"id": "new_group_id", "name": "Test Group"}
 
-        # Test audio attachment
-        msg.attachments = [SignalAttachment(content_type="audio/ogg")]
-        pm = await adapter._to_platform_message(msg)
-        assert pm.message_type == MessageType.AUDIO
+        group = await adapter.create_group("Test Group", ["+123"])
+        assert group.id == "new_group_id"
+        assert "new_group_id" in adapter.groups
 
-        # Test document attachment (unknown type)
-        msg.attachments = [SignalAttachment(content_type="application/pdf")]
-        pm = await adapter._to_platform_message(msg)
-        assert pm.message_type == MessageType.DOCUMENT
+    async def test_load_groups_cache_update(self, adapter, mock_rpc):
+        """Test loading groups and cache population"""
+        mock_rpc.return_value = [
+            {"id": "g1", "name": "Group 1"},
+            {"id": "g2", "name": "Group 2"},
+        ]
 
-        # Test multiple attachments (takes first)
-        msg.attachments = [
-            SignalAttachment(content_type="image/png"),
-            SignalAttachment(content_type="video/mp4"),
+        await adapter._load_groups()
+        assert len(adapter.groups) == 2
+        assert "g1" in adapter.groups
+        assert "g2" in adapter.groups
+
+    async def test_load_contacts_duplicate_handling(self, adapter, mock_rpc):
+        """Test loading contacts with duplicates"""
+        mock_rpc.return_value = [
+            {"number": "+123"},
+            {"number": "+456"},
+            {"number": "+123"},  # Duplicate
         ]
-        pm = await adapter._to_platform_message(msg)
-        assert pm.message_type == MessageType.IMAGE
 
-    @pytest.mark.asyncio
+        await adapter._load_contacts()
+        # Should deduplicate automatically in list
+        assert "+123" in adapter.registered_numbers
+        assert "+456" in adapter.registered_numbers
+
+    async def test_block_unblock_cache_management(self, adapter, mock_rpc):
+        """Test blocking/unblocking and cache updates"""
+        mock_rpc.return_value = True
+
+        # Test blocking
+        result = await adapter.block_contact("+123")
+        assert result is True
+        assert "+123" in adapter.blocked_numbers
+
+        # Test unblocking
+        result = await adapter.unblock_contact("+123")
+        assert result is True
+        assert "+123" not in adapter.blocked_numbers
+
+    async def test_handle_webhook_missing_envelope_fields(self, adapter):
+        """Test webhook handling with missing fields"""
+        # Test missing envelopeId
+        result = await adapter.handle_webhook({"dataMessage": {"message": "test"}})
+        assert result is not None  # Should generate UUID
+
     async def test_to_platform_message_group_handling(self, adapter):
         """Test group message handling in platform conversion"""
-        msg = SignalMessage(
-            id="1",
-            source="+123",
-            timestamp=1234567890,
+        msg = replace(
+            _BASE_MSG,
             content="group message",
             group_info={"id": "group123", "name": "Test Group"},
         )
@@ -550,15 +578,15 @@ class TestSignalAdapter:
         assert pm.chat_id == "group_group123"
         assert "[Group]" in pm.content
 
-    @pytest.mark.asyncio
     async def test_shutdown_partial_failure(self, adapter):
         """Test shutdown with partial failures"""
-        adapter.process = MagicMock()
-        adapter.process.terminate = MagicMock()
-        adapter.process.wait = AsyncMock(side_effect=Exception("terminate failed"))
+        adapter.process = SimpleNamespace(
+            terminate=MagicMock(),
+            wait=_raising("terminate failed"),
+        )
 
         async def dummy_task():
-            await asyncio.sleep(1)
+            await asyncio.Event().wait()
 
         adapter.reader_task = asyncio.create_task(dummy_task())
         adapter.reader_task.cancel()  # Cancel it so await raises CancelledError
@@ -568,193 +596,137 @@ class TestSignalAdapter:
         assert adapter.process is None
         assert adapter.reader_task is None
 
-    @pytest.mark.asyncio
-    async def test_send_receipt(self, adapter):
+    async def test_send_receipt(self, adapter, mock_rpc):
         """Test sending delivery/read receipts"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            # Test successful receipt
-            result = await adapter.send_receipt(
-                "+1234567890", ["signal_123", "signal_456"], "read"
-            )
-            assert result is True
-            mock_rpc.assert_called_once_with(
-                "sendReceipt",
-                {
-                    "recipient": "+1234567890",
-                    "type": "read",
-                    "timestamps": [123, 456],
-                },
-            )
+        mock_rpc.return_value = True
+
+        # Test successful receipt
+        result = await adapter.send_receipt(
+            "+1234567890", ["signal_123", "signal_456"], "read"
+        )
+        assert result is True
+        mock_rpc.assert_called_once_with(
+            "sendReceipt",
+            {
+                "recipient": "+1234567890",
+                "type": "read",
+                "timestamps": [123, 456],
+            },
+        )
 
-            # Test failure
-            mock_rpc.return_value = None
-            assert await adapter.send_receipt("+1234567890", ["signal_123"]) is False
-
-    @pytest.mark.asyncio
-    async def test_add_contact_exception_handling(self, adapter):
-        """Test add_contact exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.add_contact("+999", "Test Contact")
-            assert result is False
-            # Should not have added to cache
-            assert "+999" not in adapter.registered_numbers
-
-    @pytest.mark.asyncio
-    async def test_block_contact_exception_handling(self, adapter):
-        """Test block_contact exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.block_contact("+999")
-            assert result is False
-            # Should not have added to cache
-            assert "+999" not in adapter.blocked_numbers
-
-    @pytest.mark.asyncio
-    async def test_unblock_contact_exception_handling(self, adapter):
-        """Test unblock_contact exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.unblock_contact("+999")
-            assert result is False
-
-    @pytest.mark.asyncio
-    async def test_register_exception_handling(self, adapter):
-        """Test register exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.register(voice=True)
-            assert result is False
-
-    @pytest.mark.asyncio
-    async def test_verify_exception_handling(self, adapter):
-        """Test verify exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.verify("123456")
-            assert result is False
-
-    @pytest.mark.asyncio
-    async def test_send_profile(self, adapter):
+        # Test failure
+        mock_rpc.return_value = None
+        assert await adapter.send_receipt("+1234567890", ["signal_123"]) is False
+
+    @pytest.mark.parametrize(
+        "call,expected",
+        [
+            (lambda a: a.add_contact("+999", "Test Contact"), False),
+            (lambda a: a.block_contact("+999"), False),
+            (lambda a: a.unblock_contact("+999"), False),
+            (lambda a: a.register(voice=True), False),
+            (lambda a: a.verify("123456"), False),
+            (lambda a: a.send_profile(name="Test Bot"), False),
+            (lambda a: a.update_group("test_group", name="New Name"), False),
+            (lambda a: a.leave_group("test_group"), False),
+            (lambda a: a.get_group("test_group"), None),
+            (lambda a: a.upload_attachment("/tmp/test.jpg"), None),
+            (lambda a: a.create_group("Test Group", ["+111", "+222"]), None),
+        ],
+        ids=[
+            "add_contact",
+            "block_contact",
+            "unblock_contact",
+            "register",
+            "verify",
+            "send_profile",
+            "update_group",
+            "leave_group",
+            "get_group",
+            "upload_attachment",
+            "create_group",
+        ],
+    )
+    async def test_rpc_exception_handling(self, adapter, mock_rpc, call, expected):
+        """Test RPC-backed methods swallow _send_json_rpc errors"""
+        mock_rpc.side_effect = Exception("RPC error")
+
+        assert await call(adapter) is expected
+        # Nothing should have been added to the contact caches
+        assert "+999" not in adapter.registered_numbers
+        assert "+999" not in adapter.blocked_numbers
+
+    async def test_send_profile(self, adapter, mock_rpc):
         """Test profile updates"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
+        mock_rpc.return_value = True
 
-            result = await adapter.send_profile(
-                name="Test Bot", avatar_path="/tmp/avatar.jpg", about="Test bot"
-            )
-            assert result is True
-            mock_rpc.assert_called_once_with(
-                "updateProfile",
-                {
-                    "number": "+123",
-                    "name": "Test Bot",
-                    "avatar": "/tmp/avatar.jpg",
-                    "about": "Test bot",
-                },
-            )
+        result = await adapter.send_profile(
+            name="Test Bot", avatar_path="/tmp/avatar.jpg", about="Test bot"
+        )
+        assert result is True
+        mock_rpc.assert_called_once_with(
+            "updateProfile",
+            {
+                "number": "+123",
+                "name": "Test Bot",
+                "avatar": "/tmp/avatar.jpg",
+                "about": "Test bot",
+            },
+        )
 
-    @pytest.mark.asyncio
-    async def test_upload_attachment(self, adapter):
+    async def test_upload_attachment(self, adapter, mock_rpc):
         """Test attachment uploads"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = "attachment_123"
-
-            result = await adapter.upload_attachment("/tmp/test.jpg")
-            assert result == "attachment_123"
-            mock_rpc.assert_called_once_with(
-                "uploadAttachment", {"file": "/tmp/test.jpg"}
-            )
+        mock_rpc.return_value = "attachment_123"
+
+        result = await adapter.upload_attachment("/tmp/test.jpg")
+        assert result == "attachment_123"
+        mock_rpc.assert_called_once_with(
+            "uploadAttachment", {"file": "/tmp/test.jpg"}
+        )
 
-    @pytest.mark.asyncio
-    async def test_send_note_to_self(self, adapter):
+    async def test_send_note_to_self(self, adapter, pooled_async_mock, monkeypatch):
         """Test sending notes to self"""
-        with patch.object(adapter, "send_message", new_callable=AsyncMock) as mock_send:
-            mock_send.return_value = "msg_123"
+        mock_send = pooled_async_mock
+        monkeypatch.setattr(adapter, "send_message", mock_send)
+        mock_send.return_value = "msg_123"
 
-            result = await adapter.send_note_to_self("Test note")
-            assert result == "msg_123"
-            mock_send.assert_called_once_with(recipient="+123", message="Test note")
+        result = await adapter.send_note_to_self("Test note")
+        assert result == "msg_123"
+        mock_send.assert_called_once_with(recipient="+123", message="Test note")
 
-    @pytest.mark.asyncio
-    async def test_mark_read(self, adapter):
+    async def test_mark_read(self, adapter, pooled_async_mock, monkeypatch):
         """Test marking messages as read"""
-        with patch.object(
-            adapter, "send_receipt", new_callable=AsyncMock
-        ) as mock_receipt:
-            mock_receipt.return_value = True
-
-            result = await adapter.mark_read(["msg_1", "msg_2"])
-            assert result is True
-            mock_receipt.assert_called_once_with(
-                recipient="+123", message_ids=["msg_1", "msg_2"], receipt_type="read"
-            )
+        mock_receipt = pooled_async_mock
+        monkeypatch.setattr(adapter, "send_receipt", mock_receipt)
+        mock_receipt.return_value = True
+
+        result = await adapter.mark_read(["msg_1", "msg_2"])
+        assert result is True
+        mock_receipt.assert_called_once_with(
+            recipient="+123", message_ids=["msg_1", "msg_2"], receipt_type="read"
+        )
 
-    @pytest.mark.asyncio
     async def test_signal_message_types_read_delivered_session_reset(self):
         """Test SignalMessage parsing for read, delivered, and sessionReset types"""
         # Test read message type
-        read_data = {
-            "envelopeId": "read_123",
-            "source": "+1234567890",
-            "timestamp": 1234567890,
-            "type": "read",
-        }
-        msg = SignalMessage.from_dict(read_data)
+        msg = SignalMessage.from_dict(_TYPED_ENVELOPES["read"])
         assert msg.message_type == SignalMessageType.READ
         assert msg.is_receipt is True
 
         # Test delivered message type
-        delivered_data = {
-            "envelopeId": "delivered_123",
-            "source": "+1234567890",
-            "timestamp": 1234567890,
-            "type": "delivered",
-        }
-        msg = SignalMessage.from_dict(delivered_data)
+        msg = SignalMessage.from_dict(_TYPED_ENVELOPES["delivered"])
         assert msg.message_type == SignalMessageType.DELIVERED
         assert msg.is_receipt is True
 
         # Test sessionReset message type
-        reset_data = {
-            "envelopeId": "reset_123",
-            "source": "+1234567890",
-            "timestamp": 1234567890,
-            "type": "sessionReset",
-        }
-        msg = SignalMessage.from_dict(reset_data)
+        msg = SignalMessage.from_dict(_TYPED_ENVELOPES["sessionReset"])
         assert msg.message_type == SignalMessageType.SESSION_RESET
         assert msg.is_receipt is False
 
-    @pytest.mark.asyncio
     async def test_start_daemon(self, adapter):
         """Test _start_daemon method"""
-        mock_process = MagicMock()
-        mock_process.returncode = None
-        mock_process.communicate = AsyncMock(return_value=(b"", b""))
+        # communicate() is only reached once the daemon has exited
+        mock_process = SimpleNamespace(returncode=None, communicate=_daemon_failed)
 
         with patch(
             "asyncio.create_subprocess_exec", return_value=mock_process
@@ -774,22 +746,15 @@ class TestSignalAdapter:
 
         # Test failure case
         mock_process.returncode = 1
-        mock_process.communicate = AsyncMock(return_value=(b"", b"error"))
         with patch("asyncio.create_subprocess_exec", return_value=mock_process):
             with pytest.raises(Exception, match="signal-cli daemon failed"):
                 await adapter._start_daemon()
 
-    @pytest.mark.asyncio
     async def test_start_receive_process(self, adapter):
         """Test _start_receive_process method"""
-        mock_process = MagicMock()
-        mock_process.returncode = None
-        
-        # Mock stdout as AsyncMock and ensure readline returns empty bytes to stop the task
-        mock_stdout = AsyncMock()
-        mock_stdout.readline = AsyncMock(return_value=b"")  # Return empty bytes to stop reading
-        mock_process.stdout = mock_stdout
-        
+        # stdout is already at EOF, so the reader task stops immediately
+        mock_process = SimpleNamespace(returncode=None, stdout=_stream_reader())
+
         with patch(
             "asyncio.create_subprocess_exec", return_value=mock_process
         ) as mock_create:
@@ -805,67 +770,38 @@ class TestSignalAdapter:
             # Verify environment was set
             assert "SIGNAL_CLI_CONFIG" in kwargs["env"]
 
-            # Verify reader task was created
+            # Verify reader task was created; it ends on the immediate EOF
             assert adapter.reader_task is not None
-            
-            # Clean up the task to prevent it from running in background
-            if adapter.reader_task and not adapter.reader_task.done():
-                adapter.reader_task.cancel()
-                try:
-                    await adapter.reader_task
-                except asyncio.CancelledError:
-                    pass
-
-    @pytest.mark.asyncio
-    async def test_read_messages(self, adapter):
-        """Test _read_messages method"""
-        # Mock stdout as AsyncMock
-        mock_stdout = AsyncMock()
-        mock_stdout.readline = AsyncMock()
-
-        # First call returns data, second returns empty (EOF)
-        mock_stdout.readline.side_effect = [
-            json.dumps({"envelopeId": "1", "dataMessage": {"message": "test"}}).encode()
-            + b"\n",
-            b"",
-        ]
+            await asyncio.wait_for(adapter.reader_task, timeout=0.5)
 
-        adapter.process = MagicMock()
-        adapter.process.stdout = mock_stdout
+    async def test_read_messages(self, adapter, mock_handle):
+        """Test _read_messages method"""
+        # One line of data, then EOF
+        adapter.process = SimpleNamespace(stdout=_stream_reader(_READ_LINE_OK))
 
         # Mock _handle_message to avoid full processing
-        with patch.object(
-            adapter, "_handle_message", new_callable=AsyncMock
-        ) as mock_handle:
-            await adapter._read_messages()
-
-            # Verify message was handled
-            mock_handle.assert_called_once()
-            args = mock_handle.call_args[0][0]
-            assert args["envelopeId"] == "1"
-            assert "dataMessage" in args
-
-    @pytest.mark.asyncio
-    async def test_update_group_full_params(self, adapter):
-        """Test update_group with all parameters"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            result = await adapter.update_group(
-                group_id="test_group",
-                name="New Name",
-                description="New Description",
-                avatar_path="/tmp/avatar.jpg",
-                members_to_add=["+111", "+222"],
-                members_to_remove=["+333"],
-                set_admin=["+111"],
-                remove_admin=["+444"],
-            )
+        await adapter._read_messages()
 
-            assert result is True
-            mock_rpc.assert_called_once_with(
+        # Verify message was handled
+        mock_handle.assert_called_once()
+        args = mock_handle.call_args[0][0]
+        assert args["envelopeId"] == "1"
+        assert "dataMessage" in args
+
+    @pytest.mark.parametrize(
+        "call,rpc_method,params",
+        [
+            (
+                lambda a: a.update_group(
+                    group_id="test_group",
+                    name="New Name",
+                    description="New Description",
+                    avatar_path="/tmp/avatar.jpg",
+                    members_to_add=["+111", "+222"],
+                    members_to_remove=["+333"],
+                    set_admin=["+111"],
+                    remove_admin=["+444"],
+                ),
                 "updateGroup",
                 {
                     "groupId": "test_group",
@@ -877,125 +813,28 @@ class TestSignalAdapter:
                     "setAdmin": ["+111"],
                     "removeAdmin": ["+444"],
                 },
-            )
-
-    @pytest.mark.asyncio
-    async def test_leave_group_error_handling(self, adapter):
-        """Test leave_group with error handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            result = await adapter.leave_group("test_group")
-            assert result is True
-            mock_rpc.assert_called_once_with("leaveGroup", {"groupId": "test_group"})
-
-            # Test failure
-            mock_rpc.return_value = None
-            result = await adapter.leave_group("test_group")
-            assert result is False
-
-    @pytest.mark.asyncio
-    async def test_get_group_exception_handling(self, adapter):
-        """Test get_group exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.get_group("test_group")
-            assert result is None
-
-    @pytest.mark.asyncio
-    async def test_load_groups_and_contacts_rpc_calls(self, adapter):
-        """Test _load_groups and _load_contacts RPC calls"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            # Test _load_groups
-            mock_rpc.return_value = [
-                {"id": "g1", "name": "Group 1"},
-                {"id": "g2", "name": "Group 2"},
-            ]
-            await adapter._load_groups()
-            mock_rpc.assert_called_with("listGroups", {})
-
-            # Test _load_contacts
-            mock_rpc.return_value = [
-                {"number": "+111"},
-                {"number": "+222"},
-            ]
-            await adapter._load_contacts()
-            mock_rpc.assert_called_with("listContacts", {})
-
-    @pytest.mark.asyncio
-    async def test_add_contact_cache_update(self, adapter):
-        """Test add_contact cache update"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            result = await adapter.add_contact("+999", "New Contact")
-            assert result is True
-            assert "+999" in adapter.registered_numbers
-
-            # Test without result
-            mock_rpc.return_value = None
-            result = await adapter.add_contact("+888")
-            assert result is False
-            assert "+888" not in adapter.registered_numbers
-
-    @pytest.mark.asyncio
-    async def test_block_unblock_contact_cache_updates(self, adapter):
-        """Test block_contact and unblock_contact cache updates"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            # Test block
-            result = await adapter.block_contact("+999")
-            assert result is True
-            assert "+999" in adapter.blocked_numbers
-
-            # Test unblock
-            result = await adapter.unblock_contact("+999")
-            assert result is True
-            assert "+999" not in adapter.blocked_numbers
-
-    @pytest.mark.asyncio
-    async def test_register_verify_rpc_calls(self, adapter):
-        """Test register and verify RPC calls"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            # Test register with voice
-            result = await adapter.register(voice=True)
-            assert result is True
-            mock_rpc.assert_called_with("register", {"number": "+123", "voice": True})
-
-            # Test verify
-            result = await adapter.verify("123456")
-            assert result is True
-            mock_rpc.assert_called_with("verify", {"number": "+123", "code": "123456"})
-
-    @pytest.mark.asyncio
-    async def test_send_profile_rpc_call(self, adapter):
-        """Test send_profile RPC call"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            result = await adapter.send_profile(
-                name="Bot Name", avatar_path="/tmp/avatar.png", about="Bot description"
-            )
-            assert result is True
-            mock_rpc.assert_called_with(
+            ),
+            (
+                lambda a: a.leave_group("test_group"),
+                "leaveGroup",
+                {"groupId": "test_group"},
+            ),
+            (
+                lambda a: a.register(voice=True),
+                "register",
+                {"number": "+123", "voice": True},
+            ),
+            (
+                lambda a: a.verify("123456"),
+                "verify",
+                {"number": "+123", "code": "123456"},
+            ),
+            (
+                lambda a: a.send_profile(
+                    name="Bot Name",
+                    avatar_path="/tmp/avatar.png",
+                    about="Bot description",
+                ),
                 "updateProfile",
                 {
                     "number": "+123",
@@ -1003,199 +842,184 @@ class TestSignalAdapter:
                     "avatar": "/tmp/avatar.png",
                     "about": "Bot description",
                 },
-            )
+            ),
+            (
+                lambda a: a.send_reaction("recipient", "😊", "author", 1234567890),
+                "react",
+                {
+                    "recipient": "recipient",
+                    "emoji": "😊",
+                    "targetAuthor": "author",
+                    "targetTimestamp": 1234567890,
+                },
+            ),
+        ],
+        ids=[
+            "update_group",
+            "leave_group",
+            "register",
+            "verify",
+            "send_profile",
+            "send_reaction",
+        ],
+    )
+    async def test_rpc_dispatch(self, adapter, mock_rpc, call, rpc_method, params):
+        """Test each method sends the expected JSON-RPC method and params"""
+        mock_rpc.return_value = True
+
+        assert await call(adapter) is True
+        mock_rpc.assert_called_once_with(rpc_method, params)
+
+    async def test_leave_group_error_handling(self, adapter, mock_rpc):
+        """Test leave_group reports an empty RPC result as failure"""
+        mock_rpc.return_value = None
+        result = await adapter.leave_group("test_group")
+        assert result is False
+
+    async def test_load_groups_and_contacts_rpc_calls(self, adapter, mock_rpc):
+        """Test _load_groups and _load_contacts RPC calls"""
+        # Test _load_groups
+        mock_rpc.return_value = [
+            {"id": "g1", "name": "Group 1"},
+            {"id": "g2", "name": "Group 2"},
+        ]
+        await adapter._load_groups()
+        mock_rpc.assert_called_with("listGroups", {})
+
+        # Test _load_contacts
+        mock_rpc.return_value = [
+            {"number": "+111"},
+            {"number": "+222"},
+        ]
+        await adapter._load_contacts()
+        mock_rpc.assert_called_with("listContacts", {})
+
+    async def test_add_contact_cache_update(self, adapter, mock_rpc):
+        """Test add_contact cache update"""
+        mock_rpc.return_value = True
+
+        result = await adapter.add_contact("+999", "New Contact")
+        assert result is True
+        assert "+999" in adapter.registered_numbers
+
+        # Test without result
+        mock_rpc.return_value = None
+        result = await adapter.add_contact("+888")
+        assert result is False
+        assert "+888" not in adapter.registered_numbers
 
-    @pytest.mark.asyncio
-    async def test_send_profile_exception_handling(self, adapter):
-        """Test send_profile exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.send_profile(name="Test Bot")
-            assert result is False
-
-    @pytest.mark.asyncio
-    async def test_upload_attachment_exception_handling(self, adapter):
-        """Test upload_attachment exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc"
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.upload_attachment("/tmp/test.jpg")
-            assert result is None
-
-    @pytest.mark.asyncio
-    async def test_handle_webhook_exception_handling(self, adapter):
+    async def test_block_unblock_contact_cache_updates(self, adapter, mock_rpc):
+        """Test block_contact and unblock_contact cache updates"""
+        mock_rpc.return_value = True
+
+        # Test block
+        result = await adapter.block_contact("+999")
+        assert result is True
+        assert "+999" in adapter.blocked_numbers
+
+        # Test unblock
+        result = await adapter.unblock_contact("+999")
+        assert result is True
+        assert "+999" not in adapter.blocked_numbers
+
+    async def test_handle_webhook_exception_handling(self, adapter, monkeypatch):
         """Test handle_webhook exception handling"""
         with patch(
             "adapters.signal_adapter.SignalMessage.from_dict",
             side_effect=Exception("parse error"),
         ):
             # Test with dataMessage that causes exception
-            webhook_data = {
-                "envelopeId": "webhook_123",
-                "dataMessage": {"message": "test"},
-            }
-
-            result = await adapter.handle_webhook(webhook_data)
+            result = await adapter.handle_webhook(_DATA_ENVELOPE)
             assert result is None  # Should return None on exception
 
         # Test general exception
-        with patch.object(
-            adapter, "_to_platform_message", side_effect=Exception("conversion error")
-        ):
-            webhook_data = {
-                "envelopeId": "webhook_456",
-                "dataMessage": {"message": "test"},
-            }
-
-            result = await adapter.handle_webhook(webhook_data)
-            assert result is None  # Should return None on exception
+        monkeypatch.setattr(
+            adapter, "_to_platform_message", _raising("conversion error")
+        )
+        result = await adapter.handle_webhook(_DATA_ENVELOPE)
+        assert result is None  # Should return None on exception
 
-    @pytest.mark.asyncio
-    async def test_send_json_rpc_mode_selection(self, adapter):
+    async def test_send_json_rpc_mode_selection(
+        self, adapter, pooled_async_mock, monkeypatch
+    ):
         """Test _send_json_rpc mode selection"""
         # Test socket mode
         adapter.receive_mode = "socket"
-        with patch.object(
-            adapter, "_send_socket_rpc", new_callable=AsyncMock
-        ) as mock_socket:
-            mock_socket.return_value = "socket_result"
-            result = await adapter._send_json_rpc("test", {})
-            assert result == "socket_result"
-            mock_socket.assert_called_once_with("test", {})
+        mock_socket = pooled_async_mock
+        monkeypatch.setattr(adapter, "_send_socket_rpc", mock_socket)
+        mock_socket.return_value = "socket_result"
+        result = await adapter._send_json_rpc("test", {})
+        assert result == "socket_result"
+        mock_socket.assert_called_once_with("test", {})
 
         # Test stdout mode
         adapter.receive_mode = "stdout"
-        with patch.object(
-            adapter, "_send_stdout_rpc", new_callable=AsyncMock
-        ) as mock_stdout:
-            mock_stdout.return_value = "stdout_result"
-            result = await adapter._send_json_rpc("test", {})
-            assert result == "stdout_result"
-            mock_stdout.assert_called_once_with("test", {})
-
-    @pytest.mark.asyncio
+        mock_stdout = AsyncMock(return_value="stdout_result")
+        monkeypatch.setattr(adapter, "_send_stdout_rpc", mock_stdout)
+        result = await adapter._send_json_rpc("test", {})
+        assert result == "stdout_result"
+        mock_stdout.assert_called_once_with("test", {})
+        mock_socket.assert_called_once()
+
     async def test_send_stdout_rpc_return_none_case(self, adapter):
         """Test _send_stdout_rpc return None case"""
         adapter.receive_mode = "stdout"
-        adapter.process = MagicMock()
-        adapter.process.stdin = MagicMock()
-        adapter.process.stdin.write = MagicMock()
-        adapter.process.stdin.drain = AsyncMock()
-        adapter.process.stdout = AsyncMock()
-        adapter.process.stdout.readline = AsyncMock(return_value=b"")
+        # stdout is already at EOF, so readline() returns b""
+        adapter.process = SimpleNamespace(stdin=_StubStdin(), stdout=_stream_reader())
 
         result = await adapter._send_stdout_rpc("test", {})
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_send_message_quote_parsing_errors(self, adapter):
+    async def test_send_message_quote_parsing_errors(self, adapter, mock_rpc):
         """Test send_message quote parsing with invalid inputs"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = {"envelopeId": "quote_test"}
-
-            # Test with invalid quote ID (no underscore)
-            result = await adapter.send_message(
-                "recipient", "message", quote_message_id="invalid_quote_id"
-            )
-            assert result == "quote_test"
-            # Should not have quote parameter
-            call_args = mock_rpc.call_args[0]
-            params = call_args[1]
-            assert "quote" not in params
-
-            # Test with malformed quote ID
-            result = await adapter.send_message(
-                "recipient", "message", quote_message_id="signal_abc"
-            )
-            assert result == "quote_test"
-            # Should not have quote parameter due to ValueError
-            call_args = mock_rpc.call_args[0]
-            params = call_args[1]
-            assert "quote" not in params
-
-    @pytest.mark.asyncio
-    async def test_send_reaction_full_method(self, adapter):
-        """Test send_reaction full method execution"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            result = await adapter.send_reaction(
-                "recipient", "😊", "author", 1234567890
-            )
-            assert result is True
+        mock_rpc.return_value = {"envelopeId": "quote_test"}
 
-            mock_rpc.assert_called_once_with(
-                "react",
-                {
-                    "recipient": "recipient",
-                    "emoji": "😊",
-                    "targetAuthor": "author",
-                    "targetTimestamp": 1234567890,
-                },
-            )
+        # Test with invalid quote ID (no underscore)
+        result = await adapter.send_message(
+            "recipient", "message", quote_message_id="invalid_quote_id"
+        )
+        assert result == "quote_test"
+        # Should not have quote parameter
+        call_args = mock_rpc.call_args[0]
+        params = call_args[1]
+        assert "quote" not in params
+
+        # Test with malformed quote ID
+        result = await adapter.send_message(
+            "recipient", "message", quote_message_id="signal_abc"
+        )
+        assert result == "quote_test"
+        # Should not have quote parameter due to ValueError
+        call_args = mock_rpc.call_args[0]
+        params = call_args[1]
+        assert "quote" not in params
 
-    @pytest.mark.asyncio
-    async def test_send_receipt_timestamp_parsing_errors(self, adapter):
+    async def test_send_receipt_timestamp_parsing_errors(self, adapter, mock_rpc):
         """Test send_receipt timestamp parsing with invalid message IDs"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.return_value = True
-
-            # Test with invalid message IDs (no numbers after underscore)
-            result = await adapter.send_receipt(
-                "recipient", ["invalid_msg", "another_invalid"], "read"
-            )
-            assert result is True
-            
-            # Verify timestamps list is empty due to parsing failures
-            call_args = mock_rpc.call_args[0]
-            params = call_args[1]
-            assert params["timestamps"] == []
-
-            # Test with malformed message IDs
-            result = await adapter.send_receipt(
-                "recipient", ["signal_abc", "signal_xyz"], "read"
-            )
-            assert result is True
-            
-            # Should have empty timestamps due to ValueError/IndexError
-            call_args = mock_rpc.call_args[0]
-            params = call_args[1]
-            assert params["timestamps"] == []
-
-    @pytest.mark.asyncio
-    async def test_update_group_exception_handling(self, adapter):
-        """Test update_group exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.update_group("test_group", name="New Name")
-            assert result is False
-
-    @pytest.mark.asyncio
-    async def test_leave_group_exception_handling(self, adapter):
-        """Test leave_group exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.leave_group("test_group")
-            assert result is False
-
-    @pytest.mark.asyncio
+        mock_rpc.return_value = True
+
+        # Test with invalid message IDs (no numbers after underscore)
+        result = await adapter.send_receipt(
+            "recipient", ["invalid_msg", "another_invalid"], "read"
+        )
+        assert result is True
+        
+        # Verify timestamps list is empty due to parsing failures
+        call_args = mock_rpc.call_args[0]
+        params = call_args[1]
+        assert params["timestamps"] == []
+
+        # Test with malformed message IDs
+        result = await adapter.send_receipt(
+            "recipient", ["signal_abc", "signal_xyz"], "read"
+        )
+        assert result is True
+        
+        # Should have empty timestamps due to ValueError/IndexError
+        call_args = mock_rpc.call_args[0]
+        params = call_args[1]
+        assert params["timestamps"] == []
+
     async def test_handle_message_exception_handling(self, adapter):
         """Test _handle_message exception handling in handlers"""
         # Mock handlers that raise exceptions
@@ -1207,86 +1031,47 @@ class TestSignalAdapter:
         adapter.register_reaction_handler(ty_handler)
         adapter.register_receipt_handler(re_handler)
 
-        # Test message handler exception
-        await adapter._handle_message(
-            {"envelopeId": "1", "dataMessage": {"message": "test"}}
+        # Each envelope hits a different handler list, so run them together
+        await asyncio.gather(
+            adapter._handle_message(_DATA_ENVELOPE),
+            adapter._handle_message({"typing": {}}),
+            adapter._handle_message({"type": "read"}),
         )
 
-        # Test typing handler exception
-        await adapter._handle_message({"typing": {}})
-
-        # Test receipt handler exception
-        await adapter._handle_message({"type": "read"})
-
         # Handlers should have been called despite exceptions
         msg_handler.assert_called_once()
         ty_handler.assert_called_once()
         re_handler.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_initialize_load_exceptions(self, adapter):
         """Test initialize with load method exceptions"""
-        with (
-            patch.object(
-                adapter, "_start_daemon", new_callable=AsyncMock
-            ) as mock_daemon,
-            patch.object(
-                adapter,
-                "_load_groups",
-                new_callable=AsyncMock,
-                side_effect=Exception("load groups failed"),
-            ) as mock_load_groups,
-            patch.object(
-                adapter,
-                "_load_contacts",
-                new_callable=AsyncMock,
-                side_effect=Exception("load contacts failed"),
-            ) as mock_load_contacts,
-        ):
-            # Should still succeed despite load failures
-            result = await adapter.initialize()
-            assert result is True
-            assert adapter.is_initialized is True
+        adapter._start_daemon = _noop
+        adapter._load_groups = _raising("load groups failed")
+        adapter._load_contacts = _raising("load contacts failed")
 
-    @pytest.mark.asyncio
-    async def test_read_messages_json_error_handling(self, adapter):
-        """Test _read_messages with JSON decode error"""
-        mock_stdout = AsyncMock()
-        mock_stdout.readline = AsyncMock()
-
-        # First call returns invalid JSON, second returns valid data, third returns empty
-        mock_stdout.readline.side_effect = [
-            b"invalid json\n",
-            json.dumps({"envelopeId": "2", "dataMessage": {"message": "test"}}).encode()
-            + b"\n",
-            b"",
-        ]
+        # Should still succeed despite load failures
+        result = await adapter.initialize()
+        assert result is True
+        assert adapter.is_initialized is True
 
-        adapter.process = MagicMock()
-        adapter.process.stdout = mock_stdout
+    async def test_read_messages_json_error_handling(self, adapter, mock_handle):
+        """Test _read_messages with JSON decode error"""
+        # Invalid JSON, then valid data, then EOF
+        adapter.process = SimpleNamespace(
+            stdout=_stream_reader(b"invalid json\n", _READ_LINE_OK)
+        )
 
-        with patch.object(
-            adapter, "_handle_message", new_callable=AsyncMock
-        ) as mock_handle:
-            await adapter._read_messages()
+        await adapter._read_messages()
 
-            # Should have handled the valid message despite the invalid JSON
-            mock_handle.assert_called_once()
+        # Should have handled the valid message despite the invalid JSON
+        mock_handle.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_signal_message_typing_type_parsing(self):
         """Test SignalMessage.from_dict with typing type"""
-        typing_data = {
-            "envelopeId": "typing_123",
-            "source": "+1234567890",
-            "timestamp": 1234567890,
-            "type": "typing",
-        }
-        msg = SignalMessage.from_dict(typing_data)
+        msg = SignalMessage.from_dict(_TYPED_ENVELOPES["typing"])
         assert msg.message_type == SignalMessageType.TYPING
         assert msg.is_receipt is False
 
-    @pytest.mark.asyncio
     async def test_register_error_handler_coverage(self, adapter):
         """Test register_error_handler method"""
         def test_handler(error):
@@ -1296,25 +1081,15 @@ class TestSignalAdapter:
         adapter.register_error_handler(test_handler)
         assert test_handler in adapter.error_handlers
 
-    @pytest.mark.asyncio
     async def test_handle_webhook_no_data_message(self, adapter):
         """Test handle_webhook returns None when no dataMessage"""
-        # Test various non-dataMessage scenarios
-        result = await adapter.handle_webhook({"envelopeId": "test", "typing": {}})
-        assert result is None
-
-        result = await adapter.handle_webhook({"envelopeId": "test", "type": "read"})
-        assert result is None
+        for webhook_data in self._NO_DATA_WEBHOOKS:
+            assert await adapter.handle_webhook(webhook_data) is None
 
-        result = await adapter.handle_webhook({"envelopeId": "test"})
-        assert result is None
-
-    @pytest.mark.asyncio
     async def test_read_messages_early_return(self, adapter):
         """Test _read_messages early return when process.stdout is None"""
         # Test case where process.stdout is None
-        adapter.process = MagicMock()
-        adapter.process.stdout = None
+        adapter.process = SimpleNamespace(stdout=None)
 
         # Should return early without error
         await adapter._read_messages()
@@ -1322,14 +1097,3 @@ class TestSignalAdapter:
         # Test case where process is None
         adapter.process = None
         await adapter._read_messages()
-
-    @pytest.mark.asyncio
-    async def test_create_group_exception_handling(self, adapter):
-        """Test create_group exception handling"""
-        with patch.object(
-            adapter, "_send_json_rpc", new_callable=AsyncMock
-        ) as mock_rpc:
-            mock_rpc.side_effect = Exception("RPC error")
-
-            result = await adapter.create_group("Test Group", ["+111", "+222"])
-            assert result is None